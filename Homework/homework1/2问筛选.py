@@ -1,4 +1,6 @@
+import argparse
 import pandas as pd
+from 报表引擎 import industry_report, explode_industries, industry_column, wealth_column
 
 # --- 1. 参数配置 ---
 # *** 您需要修改的部分 ***
@@ -15,48 +17,79 @@ input_csv_path = '胡润百富榜完整数据.csv'
 # 输出的Excel文件名（它将被保存在与脚本相同的文件夹中）
 output_excel_path = '各行业财富与富豪数量统计报告.xlsx'
 
-# 根据test表确定的列名，这部分无需修改
-industry_column = 'hs_Rank_Rich_Industry_Cn'
-wealth_column = 'hs_Rank_Rich_Wealth'
-person_column = 'hs_Character'
-
-# --- 2. 加载并处理数据 ---
-try:
-    # 使用 pandas 读取您本地的CSV文件
-    df = pd.read_csv(input_csv_path)
-    print(f"成功加载文件: {input_csv_path}")
-    print(f"数据共有 {len(df)} 行。")
-
-except FileNotFoundError:
-    # 这里的错误提示现在对您本地环境更有意义了
-    print(f"错误：未能找到文件 '{input_csv_path}'。")
-    print("请确认：1. CSV文件名是否正确；2. Python脚本和CSV文件是否在同一个文件夹下。")
-    exit() # 如果文件未找到，则停止执行
-
-# --- 3. 数据清洗与预处理 ---
-df_cleaned = df.dropna(subset=[industry_column, wealth_column])
-print(f"数据清洗后，剩余 {len(df_cleaned)} 行有效数据进行分析。")
-
-df_cleaned[wealth_column] = pd.to_numeric(df_cleaned[wealth_column], errors='coerce')
-df_cleaned = df_cleaned.dropna(subset=[wealth_column])
-print(f"财富值转换为数字后，剩余 {len(df_cleaned)} 行可用于计算。")
-
-# --- 4. 核心统计分析 ---
-print("正在按行业统计富豪数量和总财富...")
-industry_analysis = df_cleaned.groupby(industry_column).agg(
-    富豪数量=(person_column, 'count'),
-    行业总财富=(wealth_column, 'sum')
-)
-
-# --- 5. 结果整理与输出 ---
-industry_analysis = industry_analysis.reset_index()
-industry_analysis_sorted = industry_analysis.sort_values(by='行业总财富', ascending=False)
-industry_analysis_sorted = industry_analysis_sorted.rename(columns={industry_column: '行业'})
-industry_analysis_sorted.to_excel(output_excel_path, index=False)
-
-# --- 6. 完成与展示 ---
-print("\n🎉 分析完成！")
-print(f"统计报告已成功生成并保存至: {output_excel_path}")
-print("\n--- 各行业财富与富豪数量统计概览 (按总财富排名前10) ---")
-# 使用 to_string() 保证在终端能对齐显示
-print(industry_analysis_sorted.head(10).to_string())
+# 根据test表确定的列名（industry_column、wealth_column 等）统一定义在 报表引擎.py 中
+
+
+def write_industry_report(industry_analysis_sorted, output_path=output_excel_path):
+    """把行业统计结果写入Excel并在终端展示前10名。"""
+    industry_analysis_sorted.to_excel(output_path, index=False)
+
+    print("\n🎉 分析完成！")
+    print(f"统计报告已成功生成并保存至: {output_path}")
+    print("\n--- 各行业财富与富豪数量统计概览 (按总财富排名前10) ---")
+    # 使用 to_string() 保证在终端能对齐显示
+    print(industry_analysis_sorted.head(10).to_string())
+
+
+def stream_industry_report(csv_path, chunksize=100_000):
+    """
+    流式版本的行业统计：按块读取CSV（只读取行业和财富两列），把 '饮料、医疗保健' 这类多行业拆开，
+    每块算出各行业的人数和财富合计后累加到总结果里。内存占用只与行业数量有关，与文件大小无关，
+    可用于合并后的多年榜单或全球榜单。
+    注意：一个人在他涉及的每个行业中都计数一次、财富也全额计入，因此各行业总财富之和会大于榜单总财富。
+    """
+    counts = pd.Series(dtype='int64')
+    sums = pd.Series(dtype='float64')
+    total_rows = 0
+
+    for chunk in pd.read_csv(csv_path, usecols=[industry_column, wealth_column], chunksize=chunksize):
+        total_rows += len(chunk)
+        chunk = chunk.dropna(subset=[industry_column, wealth_column])
+        chunk[wealth_column] = pd.to_numeric(chunk[wealth_column], errors='coerce')
+        chunk = explode_industries(chunk.dropna(subset=[wealth_column]))
+
+        grouped = chunk.groupby(industry_column)[wealth_column]
+        counts = counts.add(grouped.size(), fill_value=0)
+        sums = sums.add(grouped.sum(), fill_value=0)
+        print(f"已处理 {total_rows} 行，目前共 {len(counts)} 个行业。")
+
+    industry_analysis = pd.DataFrame({'富豪数量': counts.astype('int64'), '行业总财富': sums})
+    industry_analysis.index.name = '行业'
+    return industry_analysis.reset_index().sort_values(by='行业总财富', ascending=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="按行业统计富豪数量和总财富")
+    parser.add_argument('--stream', action='store_true', help="分块流式统计，并把多行业拆开分别计数（适合超大文件）")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="流式统计时每块的行数")
+    args = parser.parse_args()
+
+    if args.stream:
+        print(f"正在分块流式统计: {input_csv_path}")
+        try:
+            industry_analysis_sorted = stream_industry_report(input_csv_path, args.chunksize)
+        except FileNotFoundError:
+            print(f"错误：未能找到文件 '{input_csv_path}'。")
+            exit()
+        write_industry_report(industry_analysis_sorted)
+        exit()
+
+    # --- 2. 加载并处理数据 ---
+    try:
+        # 使用 pandas 读取您本地的CSV文件
+        df = pd.read_csv(input_csv_path)
+        print(f"成功加载文件: {input_csv_path}")
+        print(f"数据共有 {len(df)} 行。")
+
+    except FileNotFoundError:
+        # 这里的错误提示现在对您本地环境更有意义了
+        print(f"错误：未能找到文件 '{input_csv_path}'。")
+        print("请确认：1. CSV文件名是否正确；2. Python脚本和CSV文件是否在同一个文件夹下。")
+        exit() # 如果文件未找到，则停止执行
+
+    # --- 3. 数据清洗与核心统计分析（见 报表引擎.industry_report）---
+    print("正在按行业统计富豪数量和总财富...")
+    industry_analysis_sorted = industry_report(df)
+
+    # --- 4. 结果输出 ---
+    write_industry_report(industry_analysis_sorted)
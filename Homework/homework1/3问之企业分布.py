@@ -1,6 +1,10 @@
+import argparse
 import pandas as pd
-import geopandas as gpd
 import matplotlib.pyplot as plt
+from 数据加载 import load_rich_list
+from 报表引擎 import headquarters_report
+from 地图缓存 import load_china_map
+from 密度热力图 import plot_density_heatmap
 
 excel_filename = '胡润百富榜完整数据2.0.xlsx'
 
@@ -10,29 +14,15 @@ map_filepath = '中华人民共和国.json'
 
 output_image_filename = '公司总部所在地热力图.png'
 
-PROVINCE_LIST = [
-    '北京', '上海', '天津', '重庆', '河北', '山西', '辽宁', '吉林', '黑龙江',
-    '江苏', '浙江', '安徽', '福建', '江西', '山东', '河南', '湖北', '湖南',
-    '广东', '海南', '四川', '贵州', '云南', '陕西', '甘肃', '青海', '台湾',
-    '内蒙古', '广西', '西藏', '宁夏', '新疆', '香港', '澳门'
-]
+# 省份解析规则统一定义在 地区解析.py 中，供各报表共用
 
-def extract_province(location_str):
-    if not isinstance(location_str, str):
-        return None
-    
-    for province in PROVINCE_LIST:
-        if location_str.startswith(province):
-            return province
-    return None # 如果循环结束都没找到，说明不是国内地址
-
-def create_headquarters_heatmap(excel_path, map_path, column_name, output_path):
+def create_headquarters_heatmap(excel_path, map_path, column_name, output_path, density=False):
     
     print("开始生成企业总部所在地热力图")
     
     
     try:
-        df_rich = pd.read_excel(excel_path)
+        df_rich = load_rich_list(excel_path)
         print(" 成功读取Excel文件。")
     except FileNotFoundError:
         print(f"错误：找不到Excel文件 '{excel_path}'。")
@@ -41,25 +31,34 @@ def create_headquarters_heatmap(excel_path, map_path, column_name, output_path):
         print(f"错误：找不到名为 '{column_name}' 的列。")
         return
 
+    if density:
+        # 按城市坐标落点的核密度热力图（见 密度热力图.py）
+        plot_density_heatmap(df_rich[column_name], map_path, '公司总部所在地密度热力图.png',
+                             title='胡润百富榜企业总部所在地分布密度热力图')
+        return
+
     # 智能提取函数 
     print("正在从地址中智能提取省份信息...")
-    df_rich['province'] = df_rich[column_name].apply(extract_province)
-    
-    # 统计每个省份的企业数量（.dropna() 会自动移除无法匹配的国外地址）
-    province_counts = df_rich['province'].dropna().value_counts().reset_index()
-    province_counts.columns = ['province', 'count']
+    # 统计每个省份的企业数量（无法匹配的国外地址会被自动移除）
+    province_counts = headquarters_report(df_rich, column_name)
     print(" 已统计各省份企业数量：")
     print(province_counts.head())
 
+    plot_headquarters_heatmap(province_counts, map_path, output_path)
+
+
+def plot_headquarters_heatmap(province_counts, map_path, output_path=output_image_filename, dpi=300):
+    """把各省份企业数量合并到中国地图上并绘制热力图（只保存图片，不弹出窗口）。"""
 
     try:
-        gdf_map = gpd.read_file(map_path)
+        # 从几何缓存读取地图，按输出尺寸选用合适的简化级别
+        gdf_map = load_china_map(map_path, figsize=(15, 12), dpi=dpi)
         print("\n成功读取地图文件。")
     except Exception as e:
         print(f"错误：读取地图文件 '{map_path}' 失败，{e}")
         return
 
-    gdf_map['province_clean'] = gdf_map['name'].str.replace('省|市|自治区|维吾尔|壮族|回族', '', regex=True)
+    # 缓存中的 'province_clean' 已把 '广西壮族自治区'、'香港特别行政区' 等名称转换为简称
     merged_gdf = gdf_map.merge(province_counts, left_on='province_clean', right_on='province', how='left')
     merged_gdf['count'] = merged_gdf['count'].fillna(0)
     print(" 已将企业数据与地图数据合并。")
@@ -82,10 +81,14 @@ def create_headquarters_heatmap(excel_path, map_path, column_name, output_path):
         legend.set_title('企业数量')
     
 
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     plt.close(fig) 
     
     print(f"\n热力图生成完毕！已保存为图片: {output_path}")
 
 if __name__ == '__main__':
-    create_headquarters_heatmap(excel_filename, map_filepath, headquarters_column, output_image_filename)
+    parser = argparse.ArgumentParser(description="生成企业总部所在地热力图")
+    parser.add_argument('--density', action='store_true', help="绘制按城市落点的核密度热力图，而不是按省份着色")
+    args = parser.parse_args()
+    create_headquarters_heatmap(excel_filename, map_filepath, headquarters_column, output_image_filename,
+                                density=args.density)
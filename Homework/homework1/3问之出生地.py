@@ -1,6 +1,10 @@
+import argparse
 import pandas as pd
-import geopandas as gpd
 import matplotlib.pyplot as plt
+from 数据加载 import load_rich_list
+from 报表引擎 import birthplace_report
+from 地图缓存 import load_china_map
+from 密度热力图 import plot_density_heatmap
 
 # --- 文件和列名配置 ---
 excel_filename = '胡润百富榜完整数据2.0.xlsx'
@@ -9,35 +13,43 @@ birthplace_column = 'hs_Rank_Rich_BirthPlace_Cn'
 # 地图文件的路径
 map_filepath = '中华人民共和国.json' 
 
-def create_birthplace_heatmap(excel_path, map_path, column_name):
+def create_birthplace_heatmap(excel_path, map_path, column_name, density=False):
     """
     读取富豪数据和中国地图，生成出生地分布热力图。
+    density=True 时按城市坐标绘制核密度热力图（见 密度热力图.py），否则按省份着色。
     """
     print("--- 开始生成富豪出生地热力图 ---")
     
     # --- 1. 读取并处理富豪数据 ---
     try:
-        df_rich = pd.read_excel(excel_path)
+        df_rich = load_rich_list(excel_path)
         print("✅ 成功读取Excel文件。")
     except FileNotFoundError:
         print(f"❌ 错误：找不到Excel文件 '{excel_path}'。")
         return
 
-    # 清理出生地数据：提取省份
-    # 数据格式为 '中国-福建-龙岩'，我们只需要 '福建'
-    # 使用 .str.split() 分割字符串，然后取第二个元素
-    # dropna() 会移除那些出生地为空的记录
-    df_rich['province'] = df_rich[column_name].dropna().str.split('-').str[1]
-    
-    # 统计每个省份的富豪数量
-    province_counts = df_rich['province'].value_counts().reset_index()
-    province_counts.columns = ['province', 'count']
+    if density:
+        plot_density_heatmap(df_rich[column_name], map_path, '富豪出生地密度热力图.png',
+                             title='胡润百富榜出生地分布密度热力图', show=True)
+        return
+
+    # 清理出生地数据：提取省份并统计每个省份的富豪数量
+    # 数据格式为 '中国-福建-龙岩'，我们只需要 '福建'（见 报表引擎.birthplace_report 与 地区解析.py）
+    province_counts = birthplace_report(df_rich, column_name)
     print("✅ 已统计各省份富豪数量：")
     print(province_counts.head())
 
+    plot_birthplace_heatmap(province_counts, map_path)
+
+
+def plot_birthplace_heatmap(province_counts, map_path, output_image_filename='富豪出生地热力图.png', show=True, dpi=300):
+    """
+    把各省份富豪数量合并到中国地图上并绘制热力图。show=False 时只保存图片不弹出窗口。
+    """
     # --- 2. 读取地图数据 ---
     try:
-        gdf_map = gpd.read_file(map_path)
+        # 地图从几何缓存读取，省份简称已预先算好，并按输出尺寸选用合适的简化级别
+        gdf_map = load_china_map(map_path, figsize=(15, 12), dpi=dpi)
         print("\n✅ 成功读取地图文件。")
     except Exception as e:
         print(f"❌ 错误：读取地图文件 '{map_path}' 失败。请确保文件存在且未损坏。错误信息: {e}")
@@ -45,9 +57,8 @@ def create_birthplace_heatmap(excel_path, map_path, column_name):
 
     # --- 3. 合并数据 ---
     # 将我们的统计数据合并到地理信息数据上
-    # GeoDataFrame的 'name' 列通常是省份名，我们需要确保它和我们的 'province' 列能匹配上
-    # 为了稳妥，我们对两边的省份名做一点清洗，去掉'省','市'等字样
-    gdf_map['province_clean'] = gdf_map['name'].str.replace('省|市|自治区|维吾尔|壮族|回族', '', regex=True)
+    # GeoDataFrame的 'name' 列通常是省份名，缓存中的 'province_clean' 是用与出生地相同的解析规则
+    # 转换出的简称（去掉了'省','市','自治区'等字样），可以直接和我们的 'province' 列匹配
     
     # 合并两个数据集
     merged_gdf = gdf_map.merge(province_counts, left_on='province_clean', right_on='province', how='left')
@@ -82,16 +93,20 @@ def create_birthplace_heatmap(excel_path, map_path, column_name):
                 xy=(0.1, .08), xycoords='figure fraction', 
                 ha='left', va='top', fontsize=12, color='#555555')
 
-    output_image_filename = '富豪出生地热力图.png'
     # 获取图例对象并修改
     legend = ax.get_legend()
     if legend:
         legend.set_title('富豪数量')
         
-    plt.savefig(output_image_filename, dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.savefig(output_image_filename, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
     print("🎉 热力图生成完毕！")
 
 # --- 脚本执行入口 ---
 if __name__ == '__main__':
-    create_birthplace_heatmap(excel_filename, map_filepath, birthplace_column)
+    parser = argparse.ArgumentParser(description="生成富豪出生地热力图")
+    parser.add_argument('--density', action='store_true', help="绘制按城市落点的核密度热力图，而不是按省份着色")
+    args = parser.parse_args()
+    create_birthplace_heatmap(excel_filename, map_filepath, birthplace_column, density=args.density)
@@ -1,5 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from 数据加载 import load_rich_list
+from 报表引擎 import gender_report
 
 input_filename = '胡润百富榜完整数据2.0.xlsx' 
 
@@ -10,28 +12,29 @@ def create_gender_pie_chart(filename, column_name):
     
     print(f"正在读取数据文件: {filename}...")
     try:
-        df = pd.read_excel(filename)
+        df = load_rich_list(filename)
         print("文件读取成功。")
     except FileNotFoundError:
         print(f"错误：找不到文件 '{filename}'")
         return
 
-    # --- 1. 数据清洗 ---
+    # --- 1. 数据清洗与统计（见 报表引擎.gender_report）---
     print(f"正在清洗和分析 '{column_name}' 列...")
-    # 筛选出有效数据，排除 '未知' 和空值 (NaN)
-    # .copy() 用于避免 pandas 的 SettingWithCopyWarning 警告
-    valid_genders = df[df[column_name].notna() & (df[column_name] != '未知')].copy()
-    
-    if valid_genders.empty:
+    gender_counts = gender_report(df, column_name)
+
+    if gender_counts.sum() == 0:
         print("错误：清洗后没有发现任何有效的性别数据（'先生'或'女士'）。无法生成图表。")
         return
 
-    # --- 2. 数据统计 ---
-    gender_counts = valid_genders[column_name].value_counts()
     print("性别统计结果：")
     print(gender_counts)
-    
-    # --- 3. 准备绘图参数 ---
+
+    plot_gender_pie(gender_counts)
+
+
+def plot_gender_pie(gender_counts, output_image_filename='性别分布饼状图.png', show=True):
+    """根据性别统计结果绘制饼状图。show=False 时只保存图片不弹出窗口（批量生成时使用）。"""
+    # --- 2. 准备绘图参数 ---
     
     # 设置中文字体，以防图表中的中文显示为方框
     # 你可以根据你的操作系统选择 'SimHei', 'Microsoft YaHei', 'KaiTi' 等
@@ -51,7 +54,7 @@ def create_gender_pie_chart(filename, column_name):
     # 定义一组柔和、美观的颜色
     colors = ['#66b3ff', '#ff9999'] 
     
-    # --- 4. 生成饼状图 ---
+    # --- 3. 生成饼状图 ---
     fig, ax = plt.subplots(figsize=(10, 7)) # 创建画布和坐标轴
     
     wedges, texts, autotexts = ax.pie(
@@ -68,13 +71,14 @@ def create_gender_pie_chart(filename, column_name):
     # 优化图表外观
     ax.axis('equal')  # 确保饼图是正圆形
     plt.setp(autotexts, size=12, weight="bold", color="white") # 设置百分比文字样式
-    output_image_filename = '性别分布饼状图.png'
     ax.set_title('胡润百富榜上榜者性别分布', fontsize=20, pad=20) # 设置标题
 
     print("\n正在生成图表...")
     plt.savefig(output_image_filename, dpi=300, bbox_inches='tight')
-    plt.show()
-    print("图表已显示。")
+    if show:
+        plt.show()
+        print("图表已显示。")
+    plt.close(fig)
 
 # --- 脚本执行入口 ---
 if __name__ == "__main__":
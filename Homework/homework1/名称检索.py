@@ -0,0 +1,301 @@
+import os
+import re
+import time
+import pickle
+import argparse
+from bisect import bisect_left, bisect_right
+import numpy as np
+import pandas as pd
+from 数据加载 import load_rich_list, RICH_LIST_XLSX, CACHE_DIR
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    # 没有安装 pypinyin 时，中文名的拼音取自数据中对应的 _En 列（如 '张一鸣' -> 'Zhang Yiming'）
+    lazy_pinyin = None
+
+INDEX_VERSION = 3
+
+name_cn_column = 'hs_Rank_Rich_ChaName_Cn'
+name_en_column = 'hs_Rank_Rich_ChaName_En'
+company_cn_column = 'hs_Rank_Rich_ComName_Cn'
+company_en_column = 'hs_Rank_Rich_ComName_En'
+id_column = 'hs_Rank_Rich_Cha_ID'
+rank_column = 'hs_Rank_Rich_Ranking'
+wealth_column = 'hs_Rank_Rich_Wealth'
+
+# 夫妇/家族、多个企业在同一格里的分隔符，例如 '陈育新、赵桂琴'、'iCarbonX, Bgi Genomics'
+_CN_SEPARATORS = re.compile(r'[、,，/]')
+_EN_SEPARATORS = re.compile(r'[、,，/]|\s+and\s+|&')
+# 比较时忽略的字符：空白和常见标点（'Luo Tsai-Ren'、'艾哈迈德·…'）
+_IGNORED_CHARS = re.compile(r"[\s\-·•.,'’&()（）]+")
+_HAS_CHINESE = re.compile(r'[\u4e00-\u9fff]')
+
+# 普通话的全部拼音音节（不带声调），没有 pypinyin 时用来切分英文名中连写的名字
+_PINYIN_SYLLABLES = frozenset('''
+a ai an ang ao ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi chong chou
+chu chua chuai chuan chuang chui chun chuo ci cong cou cu cuan cui cun cuo
+da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du duan dui dun duo
+e ei en eng er fa fan fang fei fen feng fo fou fu
+ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+ha hai han hang hao he hei hen heng hong hou hu hua huai huan huang hui hun huo
+ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long lou lu luan lun luo lv lve
+ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+na nai nan nang nao ne nei nen neng ni nian niang niao nie nin ning niu nong nou nu nuan nuo nv nve
+o ou pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng shi shou
+shu shua shuai shuan shuang shui shun shuo si song sou su suan sui sun suo
+ta tai tan tang tao te teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+wa wai wan wang wei wen weng wo wu xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen zheng zhi zhong zhou
+zhu zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo
+'''.split())
+
+# 每个匹配项的类型，排序时同样的匹配程度下按这个顺序优先
+KIND_ORDER = ['姓名', '企业', '拼音', '首字母', '缩写', '英文']
+
+# 模糊查询时最多计算多少个候选的编辑距离
+MAX_FUZZY_CANDIDATES = 50
+
+
+def _normalize(text):
+    return _IGNORED_CHARS.sub('', str(text)).lower()
+
+
+def _split(text, separators):
+    if not isinstance(text, str):
+        return []
+    return [part.strip() for part in separators.split(text) if part.strip()]
+
+
+def _split_syllables(word):
+    """把连写的拼音切成音节（'yiming' -> ['yi', 'ming']），取音节数最少的切法；切不开时原样返回。"""
+    best = [[]] + [None] * len(word)
+    for end in range(1, len(word) + 1):
+        for start in range(max(0, end - 6), end):
+            if best[start] is not None and word[start:end] in _PINYIN_SYLLABLES:
+                if best[end] is None or len(best[start]) + 1 < len(best[end]):
+                    best[end] = best[start] + [word[start:end]]
+    return best[-1] if best[-1] else [word]
+
+
+def _pinyin_keys(cn_text, en_text):
+    """
+    返回 (全拼, 首字母, 姓全拼+名首字母)，例如 ('zhangyiming', 'zym', 'zhangym')；名只有一个字时第三项为空。
+    有 pypinyin 时按汉字转写，否则用英文名的各个单词（en_text 为 None 时不补全）。
+    """
+    if lazy_pinyin is not None and cn_text and _HAS_CHINESE.search(cn_text):
+        syllables = [s for s in lazy_pinyin(cn_text) if s.strip()]
+    elif en_text:
+        # 英文名的名字常常连写（'Zhang Yiming'），切成音节后首字母才是 'zym'
+        syllables = [piece for word in re.split(r"[\s\-']+", en_text.strip())
+                     for piece in _split_syllables(_normalize(word))]
+    else:
+        return None, None, None
+    syllables = [_normalize(s) for s in syllables if _normalize(s)]
+    initials = ''.join(s[0] for s in syllables)
+    # 两个音节时混合写法只是全拼的前缀，不需要单独的键
+    mixed = syllables[0] + initials[1:] if len(syllables) > 2 else ''
+    return ''.join(syllables), initials, mixed
+
+
+def _pattern_masks(pattern):
+    """为位并行编辑距离预先计算：每个字符在 pattern 中出现位置的位掩码。"""
+    masks = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def _edit_distance(pattern, masks, text):
+    """
+    Levenshtein 距离的位并行算法（Myers / Hyyrö）：把动态规划表的一整列压进一个整数，
+    每读入 text 的一个字符只需要十几次位运算，比逐格计算快一个数量级。
+    masks 为 _pattern_masks(pattern) 的结果，同一个查询对所有候选只计算一次。
+    """
+    if not pattern:
+        return len(text)
+    full = (1 << len(pattern)) - 1
+    top = 1 << (len(pattern) - 1)
+    positive, negative, score = full, 0, len(pattern)
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & full)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & top:
+            score += 1
+        elif horizontal_negative & top:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & full)
+        negative = horizontal_positive & vertical
+    return score
+
+
+def _bigrams(key):
+    padded = f'^{key}$'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NameSearchIndex:
+    """
+    榜单的本地名称检索索引，覆盖人名、企业名、它们的拼音/首字母以及英文名。
+    前缀查询在排好序的键列表上二分查找；模糊查询先用二元组（bigram）倒排表筛出候选，
+    再只对候选计算编辑距离。整个索引可以 pickle 到磁盘，启动时直接读取。
+    """
+
+    def __init__(self, df):
+        self.records = pd.DataFrame({
+            '人物ID': df[id_column].astype(str).to_numpy(),
+            '姓名': df[name_cn_column].to_numpy(),
+            '企业': df[company_cn_column].to_numpy(),
+            '排名': df[rank_column].to_numpy(),
+            '财富(亿元)': df[wealth_column].to_numpy(),
+        }).to_dict('records')
+
+        entries = set()
+        columns = zip(df[name_cn_column], df[name_en_column], df[company_cn_column], df[company_en_column])
+        for row, (name_cn, name_en, company_cn, company_en) in enumerate(columns):
+            for cn_column_kind, cn_text, en_text in (('姓名', name_cn, name_en), ('企业', company_cn, company_en)):
+                cn_parts = _split(cn_text, _CN_SEPARATORS)
+                en_parts = _split(en_text, _EN_SEPARATORS)
+                for part in cn_parts:
+                    entries.add((_normalize(part), row, cn_column_kind, part))
+                for part in en_parts:
+                    entries.add((_normalize(part), row, '英文', part))
+                # 中英文个数一致时才能一一对应，用英文名补全拼音；企业的英文名多为意译，不能当拼音用
+                can_pair = cn_column_kind == '姓名' and len(en_parts) == len(cn_parts)
+                paired = en_parts if can_pair else [None] * len(cn_parts)
+                for cn_part, en_part in zip(cn_parts, paired):
+                    full, initials, mixed = _pinyin_keys(cn_part, en_part)
+                    if full:
+                        entries.add((full, row, '拼音', cn_part))
+                        entries.add((initials, row, '首字母', cn_part))
+                        # 姓用全拼、名用首字母的混合写法（'zhangym'）
+                        entries.add((mixed, row, '缩写', cn_part))
+        entries = sorted(entry for entry in entries if entry[0])
+
+        self.keys = [entry[0] for entry in entries]
+        self.key_rows = np.array([entry[1] for entry in entries], dtype=np.int32)
+        self.key_kinds = [entry[2] for entry in entries]
+        self.key_labels = [entry[3] for entry in entries]
+        self.key_lengths = np.array([len(key) for key in self.keys], dtype=np.int32)
+
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in _bigrams(key):
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def _prefix_matches(self, query):
+        start = bisect_left(self.keys, query)
+        end = bisect_right(self.keys, query + '\uffff')
+        return range(start, end)
+
+    def _fuzzy_matches(self, query, max_distance):
+        grams = _bigrams(query)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.keys))
+        # 每处编辑最多破坏两个二元组，共享的二元组太少的键不可能在距离范围内
+        candidates = np.flatnonzero((shared >= len(grams) - 2 * max_distance) & (shared > 0)
+                                    & (np.abs(self.key_lengths - len(query)) <= max_distance))
+        # 只对共享二元组最多的一批候选计算编辑距离，保证查询耗时稳定
+        if len(candidates) > MAX_FUZZY_CANDIDATES:
+            best = np.argpartition(-shared[candidates], MAX_FUZZY_CANDIDATES - 1)[:MAX_FUZZY_CANDIDATES]
+            candidates = candidates[best]
+        masks = _pattern_masks(query)
+        matches = []
+        for position in candidates:
+            distance = _edit_distance(query, masks, self.keys[position])
+            if distance <= max_distance:
+                matches.append((position, distance))
+        return matches
+
+    def search(self, query, limit=10, fuzzy=True, max_distance=None):
+        """
+        查询姓名或企业。完全匹配排在最前，其次是前缀匹配（键越短越靠前），
+        结果不足 limit 条时再补充模糊匹配（编辑距离越小越靠前）。每个人物只出现一次。
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(query) <= 4 else 2
+
+        scored = {}
+
+        def add(position, score):
+            row = int(self.key_rows[position])
+            score = score + (KIND_ORDER.index(self.key_kinds[position]) / 10,)
+            if row not in scored or score < scored[row][0]:
+                scored[row] = (score, position)
+
+        for position in self._prefix_matches(query):
+            exact = self.keys[position] == query
+            # 缩写键的前缀匹配排在其他前缀匹配之后，否则 'zhang' 会先匹配到詹国海的 'zhangh'
+            partial_abbreviation = not exact and self.key_kinds[position] == '缩写'
+            add(position, (0 if exact else 1, partial_abbreviation, len(self.keys[position])))
+        if fuzzy and len(scored) < limit:
+            for position, distance in self._fuzzy_matches(query, max_distance):
+                add(position, (2, distance))
+
+        best = sorted(scored.items(), key=lambda item: item[1][0])[:limit]
+        return [dict(self.records[row], 匹配=self.key_labels[position], 类型=self.key_kinds[position])
+                for row, (_, position) in best]
+
+
+def _index_path(source_path, cache_dir):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f'{name}.search.pkl')
+
+
+def load_search_index(path=RICH_LIST_XLSX, cache_dir=CACHE_DIR, rebuild=False):
+    """读取磁盘上的检索索引；不存在、数据文件有变化或 pypinyin 安装情况改变时重新构建并保存。"""
+    stat = os.stat(path)
+    signature = (INDEX_VERSION, stat.st_mtime, stat.st_size, lazy_pinyin is not None)
+    index_path = _index_path(path, cache_dir)
+    if not rebuild and os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            saved_signature, state = pickle.load(f)
+        if saved_signature == signature:
+            index = NameSearchIndex.__new__(NameSearchIndex)
+            index.__dict__.update(state)
+            return index
+
+    print("正在构建名称检索索引...")
+    index = NameSearchIndex(load_rich_list(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, 'wb') as f:
+        # 只保存属性字典：以脚本方式运行时类属于 __main__，直接 pickle 对象后在别处无法读取
+        pickle.dump((signature, index.__dict__), f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"索引已保存至 '{index_path}'：{len(index.keys)} 个检索键。")
+    return index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="在本地榜单数据中按姓名/企业/拼音检索")
+    parser.add_argument('query', nargs='+', help="查询词，例如 张一鸣、字节、zhangym、zym、bytedance")
+    parser.add_argument('-n', '--limit', type=int, default=10)
+    parser.add_argument('--no-fuzzy', action='store_true', help="只做前缀匹配")
+    parser.add_argument('--rebuild', action='store_true', help="强制重建索引")
+    args = parser.parse_args()
+
+    index = load_search_index(rebuild=args.rebuild)
+    for query in args.query:
+        start = time.perf_counter()
+        results = index.search(query, limit=args.limit, fuzzy=not args.no_fuzzy)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"\n'{query}'：{len(results)} 条结果（{elapsed_ms:.3f} 毫秒）")
+        if results:
+            print(pd.DataFrame(results).to_string(index=False))
@@ -0,0 +1,99 @@
+import re
+import numpy as np
+import pandas as pd
+
+# 省级行政区简称 -> 常见英文写法（数据中的 _En 列使用这些写法，含个别拼写错误）
+PROVINCE_ALIASES = {
+    '北京': ['Beijing'], '上海': ['Shanghai'], '天津': ['Tianjin'], '重庆': ['Chongqing'],
+    '河北': ['Hebei', 'Heibei'], '山西': ['Shanxi'], '辽宁': ['Liaoning'], '吉林': ['Jilin'],
+    '黑龙江': ['Heilongjiang'], '江苏': ['Jiangsu'], '浙江': ['Zhejiang'], '安徽': ['Anhui'],
+    '福建': ['Fujian'], '江西': ['Jiangxi'], '山东': ['Shandong'], '河南': ['Henan'],
+    '湖北': ['Hubei'], '湖南': ['Hunan'], '广东': ['Guangdong'], '海南': ['Hainan'],
+    '四川': ['Sichuan'], '贵州': ['Guizhou'], '云南': ['Yunnan'], '陕西': ['Shaanxi'],
+    '甘肃': ['Gansu'], '青海': ['Qinghai'], '台湾': ['Taiwan'],
+    '内蒙古': ['Inner Mongolia', 'Nei Mongol'], '广西': ['Guangxi'], '西藏': ['Tibet', 'Xizang'],
+    '宁夏': ['Ningxia'], '新疆': ['Xinjiang'], '香港': ['Hong Kong', 'Hongkong'], '澳门': ['Macau', 'Macao'],
+}
+
+PROVINCE_LIST = list(PROVINCE_ALIASES)
+
+MUNICIPALITIES = {'北京', '上海', '天津', '重庆', '香港', '澳门'}
+
+# 省级名称后面可能跟着的后缀，例如 '广西壮族自治区'、'香港特别行政区'
+_PROVINCE_SUFFIX = r'(?:省|市|壮族自治区|回族自治区|维吾尔自治区|自治区|特别行政区)?'
+
+# 按长度倒序拼成一个正则，保证 '黑龙江'、'内蒙古' 这类长名称优先匹配；'内蒙' 是数据中出现过的简写
+_CN_NAMES = sorted(PROVINCE_LIST + ['内蒙'], key=len, reverse=True)
+_CN_PATTERN = re.compile(r'^\s*(?:中国\s*-?\s*)?(' + '|'.join(_CN_NAMES) + ')' + _PROVINCE_SUFFIX + r'\s*-?\s*(.*)$')
+
+_EN_TO_CN = {alias.lower(): cn for cn, aliases in PROVINCE_ALIASES.items() for alias in aliases}
+_EN_NAMES = sorted(_EN_TO_CN, key=len, reverse=True)
+_EN_PATTERN = re.compile(r'^\s*(?:china\s*-?\s*)?(' + '|'.join(re.escape(name) for name in _EN_NAMES) + r')\b\s*-?\s*(.*)$',
+                         re.IGNORECASE)
+
+# 自由格式地址里的地级市，例如 '杭州市西湖区…' 中的 '杭州'
+_CN_CITY_PATTERN = re.compile(r'^(.+?)(?:市|自治州|地区|盟)')
+
+# 已解析过的字符串 -> (省份, 城市)，多次调用之间共享
+_CACHE = {}
+
+
+def _resolve_one(text):
+    if not isinstance(text, str):
+        return None, None
+    match = _CN_PATTERN.match(text)
+    if match:
+        province, rest = match.groups()
+        province = '内蒙古' if province == '内蒙' else province
+        rest = rest.split('-')[0].strip().strip('、,，')
+        if province in MUNICIPALITIES:
+            # 直辖市/特别行政区本身就是地级单位，后面跟的是区县
+            return province, province
+        city_match = _CN_CITY_PATTERN.match(rest)
+        if city_match:
+            return province, city_match.group(1)
+        # '浙江杭州' 这种省+市简写，剩下的部分不长时直接当作城市
+        return province, (rest if 0 < len(rest) <= 4 else None)
+
+    match = _EN_PATTERN.match(text)
+    if match:
+        province = _EN_TO_CN[match.group(1).lower()]
+        if province in MUNICIPALITIES:
+            return province, province
+        rest = match.group(2).split('-')[0].strip()
+        return province, (rest or None)
+    return None, None
+
+
+def resolve_places(locations):
+    """
+    把一整列地址解析成省份和地级市，返回包含 'province'、'city' 两列的表格（索引与输入一致）。
+    支持 '中国-福建-龙岩'、'浙江杭州'、'广东省深圳市南山区…' 等中文写法以及 'China-Fujian-Longyan'
+    等英文写法，省份统一为中文简称（与地图清洗后的名称一致），国外地址返回空值。
+    先对整列去重，每个不同的字符串只解析一次，所以百万行的输入也只需要处理几百个字符串。
+    """
+    locations = pd.Series(locations)
+    codes, uniques = pd.factorize(locations)
+    resolved = []
+    for text in uniques:
+        if text not in _CACHE:
+            _CACHE[text] = _resolve_one(text)
+        resolved.append(_CACHE[text])
+
+    provinces = np.array([province for province, _ in resolved] + [None], dtype=object)
+    cities = np.array([city for _, city in resolved] + [None], dtype=object)
+    # factorize 把空值编码为 -1，正好取到末尾补上的 None
+    return pd.DataFrame({'province': provinces[codes], 'city': cities[codes]}, index=locations.index)
+
+
+def resolve_province(locations):
+    return resolve_places(locations)['province']
+
+
+def resolve_city(locations):
+    return resolve_places(locations)['city']
+
+
+def extract_province(location_str):
+    """解析单个地址的省份，国外地址或无法识别时返回 None。"""
+    return resolve_places([location_str])['province'].iloc[0]
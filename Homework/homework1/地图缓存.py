@@ -0,0 +1,115 @@
+import os
+import json
+import geopandas as gpd
+import shapely
+from 地区解析 import resolve_province
+
+MAP_PATH = '中华人民共和国.json'
+
+CACHE_DIR = '缓存'
+
+# 各简化级别的容差（单位：度），0 表示原始精度
+SIMPLIFY_LEVELS = [0, 0.02, 0.05, 0.1]
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def _level_column(level):
+    return f'geometry_{level}'
+
+
+def _simplify(geometries, tolerance):
+    """
+    保持拓扑的简化。shapely>=2.1 提供 coverage_simplify，会把相邻省份的公共边界一起简化，
+    省界之间不会出现缝隙或重叠；旧版本退回逐个多边形的 simplify(preserve_topology=True)。
+    """
+    if hasattr(shapely, 'coverage_simplify'):
+        return shapely.coverage_simplify(geometries, tolerance)
+    return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+
+def build_map_cache(map_path=MAP_PATH, cache_dir=CACHE_DIR):
+    """读取GeoJSON，预先计算省份简称和各级简化几何，保存为二进制缓存文件。"""
+    print(f"正在读取地图文件 '{map_path}' 并生成几何缓存...")
+    gdf_map = gpd.read_file(map_path)
+    gdf_map['province_clean'] = resolve_province(gdf_map['name'])
+
+    geometries = gdf_map.geometry.values
+    # 最后一个要素（南海诸岛等）与各省不构成覆盖关系，只对省级多边形做联合简化
+    is_province = gdf_map['province_clean'].notna().to_numpy()
+    cache = gdf_map[['name', 'province_clean']].copy()
+    for level in SIMPLIFY_LEVELS:
+        if level == 0:
+            simplified = geometries
+        else:
+            simplified = geometries.copy()
+            simplified[is_province] = _simplify(geometries[is_province], level)
+            simplified[~is_province] = shapely.simplify(geometries[~is_province], level, preserve_topology=True)
+        cache[_level_column(level)] = gpd.GeoSeries(simplified, crs=gdf_map.crs)
+    cache = gpd.GeoDataFrame(cache, geometry=_level_column(0), crs=gdf_map.crs)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _cache_paths(map_path, cache_dir)
+    if CACHE_FORMAT == 'parquet':
+        cache.to_parquet(data_path, index=False)
+    else:
+        cache.to_pickle(data_path)
+    stat = os.stat(map_path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': CACHE_FORMAT, 'mtime': stat.st_mtime, 'size': stat.st_size,
+                   'levels': SIMPLIFY_LEVELS}, f)
+    return cache
+
+
+def _cache_paths(map_path, cache_dir):
+    name = os.path.splitext(os.path.basename(map_path))[0]
+    return (os.path.join(cache_dir, f'{name}.geo.{CACHE_FORMAT}'),
+            os.path.join(cache_dir, f'{name}.geo.meta.json'))
+
+
+def _read_map_cache(map_path, cache_dir):
+    data_path, meta_path = _cache_paths(map_path, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    stat = os.stat(map_path)
+    if (meta.get('format') != CACHE_FORMAT or meta.get('levels') != SIMPLIFY_LEVELS
+            or meta.get('mtime') != stat.st_mtime or meta.get('size') != stat.st_size):
+        return None
+    if CACHE_FORMAT == 'parquet':
+        return gpd.read_parquet(data_path)
+    return gpd.GeoDataFrame(gpd.pd.read_pickle(data_path))
+
+
+def pick_level(bounds, figsize=(15, 12), dpi=300):
+    """按输出尺寸选择简化级别：简化误差不超过约两个像素，肉眼看不出差别。"""
+    min_x, min_y, max_x, max_y = bounds
+    degrees_per_pixel = max((max_x - min_x) / (figsize[0] * dpi), (max_y - min_y) / (figsize[1] * dpi))
+    candidates = [level for level in SIMPLIFY_LEVELS if level <= 2 * degrees_per_pixel]
+    return max(candidates)
+
+
+def load_china_map(map_path=MAP_PATH, figsize=(15, 12), dpi=300, level=None, cache_dir=CACHE_DIR):
+    """
+    读取中国地图，返回带 'name'、'province_clean' 两列的 GeoDataFrame。
+    第一次调用时生成缓存，之后源文件不变就直接读取缓存；
+    level 为 None 时根据 figsize 和 dpi 自动选择合适的简化级别。
+    """
+    if not os.path.exists(map_path):
+        raise FileNotFoundError(map_path)
+    cache = _read_map_cache(map_path, cache_dir)
+    if cache is None:
+        cache = build_map_cache(map_path, cache_dir)
+
+    if level is None:
+        level = pick_level(cache.total_bounds, figsize, dpi)
+    elif level not in SIMPLIFY_LEVELS:
+        raise ValueError(f"简化级别必须是 {SIMPLIFY_LEVELS} 之一")
+
+    gdf_map = cache[['name', 'province_clean']].copy()
+    return gpd.GeoDataFrame(gdf_map, geometry=cache[_level_column(level)].values, crs=cache.crs)
@@ -0,0 +1,101 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely import STRtree
+from 地区解析 import resolve_places
+from 地图缓存 import load_china_map, MAP_PATH
+
+# 本地地名坐标表：地级市（及数据中出现的县级市）的经纬度，省会标记 is_capital=1，
+# aliases 列记录数据里出现过的错别字/别称（如 '蚌阜'、'毫州'），用 | 分隔
+GAZETTEER_PATH = '城市坐标.csv'
+
+_GAZETTEER = {}
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """读取地名坐标表，把别称展开成独立的行，返回以 (province, city) 为索引的表格。"""
+    if path not in _GAZETTEER:
+        table = pd.read_csv(path, dtype={'aliases': str}).fillna({'aliases': ''})
+        alias_rows = []
+        for row in table.itertuples(index=False):
+            for alias in filter(None, row.aliases.split('|')):
+                alias_rows.append(row._replace(city=alias))
+        table = pd.concat([table, pd.DataFrame(alias_rows, columns=table.columns)], ignore_index=True)
+        _GAZETTEER[path] = table.set_index(['province', 'city'])[['lon', 'lat', 'is_capital']]
+    return _GAZETTEER[path]
+
+
+def geocode(locations, gazetteer_path=GAZETTEER_PATH):
+    """
+    把一列地址（如 hs_Rank_Rich_ComHeadquarters_Cn、hs_Rank_Rich_BirthPlace_Cn）转换为经纬度。
+    能识别到地级市的用城市坐标（precision='city'），只识别到省份的用省会坐标（precision='province'），
+    国外或无法识别的地址坐标为空。返回包含 province、city、lon、lat、precision 的表格。
+    """
+    gazetteer = load_gazetteer(gazetteer_path)
+    places = resolve_places(locations)
+
+    city_rows = gazetteer.index.get_indexer(pd.MultiIndex.from_arrays([places['province'], places['city']]))
+    capitals = gazetteer[gazetteer['is_capital'] == 1].reset_index().drop_duplicates('province').set_index('province')
+    province_rows = gazetteer.index.get_indexer(
+        pd.MultiIndex.from_arrays([places['province'], places['province'].map(capitals['city'])]))
+
+    rows = np.where(city_rows >= 0, city_rows, province_rows)
+    found = rows >= 0
+    lon = np.full(len(places), np.nan)
+    lat = np.full(len(places), np.nan)
+    lon[found] = gazetteer['lon'].to_numpy()[rows[found]]
+    lat[found] = gazetteer['lat'].to_numpy()[rows[found]]
+    precision = np.where(city_rows >= 0, 'city', np.where(province_rows >= 0, 'province', None))
+    return places.assign(lon=lon, lat=lat, precision=precision)
+
+
+def spatial_join(lon, lat, polygons):
+    """
+    点落在哪个多边形里：用 STRtree 空间索引一次性批量查询所有点，
+    返回每个点对应的多边形行号（不在任何多边形内为 -1）。
+    polygons 可以是省级地图，也可以是地级市/区县边界（GeoDataFrame，坐标系为经纬度）。
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    result = np.full(len(lon), -1, dtype=np.int64)
+    valid = ~(np.isnan(lon) | np.isnan(lat))
+
+    points = shapely.points(lon[valid], lat[valid])
+    tree = STRtree(polygons.geometry.values)
+    point_idx, polygon_idx = tree.query(points, predicate='within')
+    # 同一个点落在多个多边形里（边界重叠）时取行号最小的一个
+    order = np.lexsort((-polygon_idx, point_idx))
+    result_valid = np.full(len(points), -1, dtype=np.int64)
+    result_valid[point_idx[order]] = polygon_idx[order]
+    result[valid] = result_valid
+    return result
+
+
+def count_points_in_polygons(locations, polygons):
+    """地理编码 + 空间连接，返回在 polygons 上增加了 'count' 列的副本，可直接用于绘制分级设色地图。"""
+    coords = geocode(locations)
+    polygon_rows = spatial_join(coords['lon'], coords['lat'], polygons)
+    counts = np.bincount(polygon_rows[polygon_rows >= 0], minlength=len(polygons))
+    return polygons.assign(count=counts)
+
+
+if __name__ == '__main__':
+    from 数据加载 import load_rich_list
+
+    parser = argparse.ArgumentParser(description="把富豪的总部/出生地地址转换为坐标并统计落在各区域内的人数")
+    parser.add_argument('--column', default='hs_Rank_Rich_ComHeadquarters_Cn', help="地址列名")
+    parser.add_argument('--polygons', default=None,
+                        help="区域边界文件（如地级市/区县GeoJSON），默认使用省级地图")
+    args = parser.parse_args()
+
+    df = load_rich_list()
+    polygons = gpd.read_file(args.polygons) if args.polygons else load_china_map(MAP_PATH, level=0)
+
+    start = time.perf_counter()
+    result = count_points_in_polygons(df[args.column], polygons)
+    print(f"{len(df)} 个地址完成地理编码和空间连接，耗时 {time.perf_counter() - start:.3f} 秒。")
+    name_column = 'province_clean' if 'province_clean' in result.columns else 'name'
+    print(result[[name_column, 'count']].sort_values('count', ascending=False).head(15).to_string(index=False))
@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import pandas as pd
+import requests
+from 爬 import HostTokenBucket, create_session
+from 数据加载 import load_rich_list
+
+PHOTO_DIR = '头像'
+# 图片地址 -> 内容哈希 的索引，已下载过的地址不会再次请求
+INDEX_FILENAME = '地址索引.json'
+
+photo_column = 'hs_Rank_Rich_Photo'
+
+THUMBNAIL_SIZE = (128, 128)
+
+# 按内容开头的特征字节识别图片格式和扩展名；识别不出的内容（错误页、被拦截的页面）不保存
+_MAGIC_BYTES = [(b'\xff\xd8\xff', '.jpg'), (b'\x89PNG\r\n\x1a\n', '.png'), (b'GIF87a', '.gif'), (b'GIF89a', '.gif')]
+
+
+def _original_path(photo_dir, digest, extension):
+    # 按哈希前两位分子目录，避免单个目录里文件过多
+    return os.path.join(photo_dir, 'original', digest[:2], digest + extension)
+
+
+def _thumbnail_path(photo_dir, digest, size):
+    return os.path.join(photo_dir, 'thumbs', f'{size[0]}x{size[1]}', digest[:2], digest + '.jpg')
+
+
+def load_url_index(photo_dir=PHOTO_DIR):
+    path = os.path.join(photo_dir, INDEX_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_url_index(url_index, photo_dir=PHOTO_DIR):
+    os.makedirs(photo_dir, exist_ok=True)
+    path = os.path.join(photo_dir, INDEX_FILENAME)
+    # 先写临时文件再替换，中途中断也不会留下损坏的索引
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(url_index, f, ensure_ascii=False, indent=0)
+    os.replace(path + '.tmp', path)
+
+
+def image_extension(content):
+    """按特征字节判断内容是不是图片，返回扩展名，不是图片时返回 None。"""
+    for magic, extension in _MAGIC_BYTES:
+        if content.startswith(magic):
+            return extension
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def fetch_photo(session, url, rate_limiter=None):
+    """下载一张图片，返回 (内容, 扩展名)。响应不是图片时抛出 ValueError。"""
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    response = session.get(url, headers={'Accept': 'image/*'}, timeout=20)
+    response.raise_for_status()
+    extension = image_extension(response.content)
+    if extension is None:
+        content_type = response.headers.get('Content-Type', '')
+        raise ValueError(f"响应不是图片（Content-Type: {content_type or '无'}，{len(response.content)} 字节）")
+    return response.content, extension
+
+
+def store_photo(content, extension, photo_dir=PHOTO_DIR):
+    """按内容的 SHA-256 保存图片，内容相同的图片（如默认头像）只保存一份。返回 '哈希+扩展名'。"""
+    digest = hashlib.sha256(content).hexdigest()
+    path = _original_path(photo_dir, digest, extension)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+    return digest + extension
+
+
+def download_photos(urls, photo_dir=PHOTO_DIR, max_workers=8, rate=8.0):
+    """
+    并发下载一批图片地址：先去重，跳过索引中已有且文件存在的地址，
+    其余的交给线程池（共享连接池，按域名限速）下载。返回 {地址: '哈希+扩展名'}，下载失败的地址不在其中。
+    """
+    url_index = load_url_index(photo_dir)
+    unique_urls = [url for url in pd.unique(pd.Series(urls).dropna()) if str(url).startswith('http')]
+
+    def cached(url):
+        stored = url_index.get(url)
+        return stored is not None and os.path.exists(_original_path(photo_dir, *os.path.splitext(stored)))
+
+    pending = [url for url in unique_urls if not cached(url)]
+    print(f"共 {len(unique_urls)} 个不同的图片地址，其中 {len(unique_urls) - len(pending)} 个已缓存，"
+          f"需要下载 {len(pending)} 个。")
+
+    failed = []
+    if pending:
+        session = create_session(pool_size=max_workers)
+        rate_limiter = HostTokenBucket(rate=rate, burst=max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_photo, session, url, rate_limiter): url for url in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                url = futures[future]
+                try:
+                    url_index[url] = store_photo(*future.result(), photo_dir=photo_dir)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    failed.append(url)
+                    print(f"❌ 下载失败 {url}: {e}")
+                if done % 200 == 0:
+                    print(f"已完成 {done} / {len(pending)}")
+                    save_url_index(url_index, photo_dir)
+        save_url_index(url_index, photo_dir)
+    if failed:
+        print(f"⚠️ {len(failed)} 张图片下载失败，重新运行会再次尝试。")
+    return {url: url_index[url] for url in unique_urls if url in url_index}
+
+
+def _make_thumbnail(source, target, size):
+    """在子进程中生成一张缩略图：居中裁剪到固定尺寸，统一保存为JPEG。"""
+    from PIL import Image, ImageOps
+    with Image.open(source) as image:
+        thumbnail = ImageOps.fit(image.convert('RGB'), size, Image.LANCZOS)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    thumbnail.save(target + '.tmp', format='JPEG', quality=85)
+    os.replace(target + '.tmp', target)
+    return target
+
+
+def make_thumbnails(stored_names, photo_dir=PHOTO_DIR, size=THUMBNAIL_SIZE, max_workers=None):
+    """
+    为已下载的图片生成固定尺寸的缩略图（解码和缩放占用CPU，用进程池并行），已存在的缩略图跳过。
+    返回 {'哈希+扩展名': 缩略图路径}。
+    """
+    thumbnails, jobs = {}, {}
+    for stored in set(stored_names):
+        digest, extension = os.path.splitext(stored)
+        target = _thumbnail_path(photo_dir, digest, size)
+        if os.path.exists(target):
+            thumbnails[stored] = target
+        else:
+            jobs[stored] = (_original_path(photo_dir, digest, extension), target)
+    print(f"需要生成 {len(jobs)} 张缩略图（{len(thumbnails)} 张已存在）。")
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_make_thumbnail, source, target, size): stored
+                       for stored, (source, target) in jobs.items()}
+            for future in as_completed(futures):
+                stored = futures[future]
+                try:
+                    thumbnails[stored] = future.result()
+                except Exception as e:
+                    # 损坏或不是图片的文件（例如被重定向到的错误页）跳过
+                    print(f"❌ 无法生成缩略图 {stored}: {e}")
+    return thumbnails
+
+
+def build_photo_table(df, photo_dir=PHOTO_DIR, size=THUMBNAIL_SIZE, max_workers=8, rate=8.0, thumbnail_workers=None):
+    """下载全部头像并生成缩略图，返回与 df 行对应的 '头像文件'、'缩略图' 两列，可直接用于图文报告。"""
+    url_to_stored = download_photos(df[photo_column], photo_dir, max_workers, rate)
+    stored_to_thumbnail = make_thumbnails(url_to_stored.values(), photo_dir, size, thumbnail_workers)
+    stored = df[photo_column].map(url_to_stored)
+    return pd.DataFrame({'头像文件': stored, '缩略图': stored.map(stored_to_thumbnail)}, index=df.index)
+
+
+def self_check():
+    """
+    不联网的自检：在本机线程里起一个 http.server 提供几张图片，检查同一地址只下载一次、
+    内容相同的图片只保存一份、再次运行命中磁盘缓存，以及 404 和不是图片的内容不进索引（下次重试）。
+    """
+    import io
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (200, 150), (200, 60, 60)).save(buffer, format='PNG')
+    png = buffer.getvalue()
+    # 路径 -> (状态码, Content-Type, 内容)；a、b 内容相同，bad 声称是 JPEG 但不是图片
+    routes = {
+        '/a.png': (200, 'image/png', png),
+        '/b.png': (200, 'image/png', png),
+        '/bad.jpg': (200, 'image/jpeg', b'<html>not an image</html>'),
+    }
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            status, content_type, body = routes.get(self.path, (404, 'text/plain', b'not found'))
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    a, b, bad, missing = (base + path for path in ['/a.png', '/b.png', '/bad.jpg', '/missing.png'])
+
+    def check(condition, message):
+        # 不用 assert：python -O 运行时 assert 会被跳过，自检就什么也没检查
+        if not condition:
+            raise RuntimeError(f"自检失败：{message}")
+
+    try:
+        with tempfile.TemporaryDirectory() as photo_dir:
+            stored = download_photos([a, a, b, bad, missing, None], photo_dir, max_workers=4, rate=100)
+            check(set(stored) == {a, b}, f"下载结果应只有两张有效图片，实际为 {stored}")
+            check(hits == {'/a.png': 1, '/b.png': 1, '/bad.jpg': 1, '/missing.png': 1},
+                  f"每个地址应只请求一次，实际为 {hits}")
+            check(stored[a] == stored[b] and stored[a].endswith('.png'), f"内容相同的图片应保存为同一个文件，实际为 {stored}")
+            check(len(os.listdir(os.path.join(photo_dir, 'original'))) == 1, "磁盘上应只保存一份图片")
+
+            # 第二次运行：已缓存的地址不再请求，失败的地址（404 和不是图片的内容）重试
+            again = download_photos([a, b, bad, missing], photo_dir, max_workers=4, rate=100)
+            check(again == stored, f"第二次运行的结果应与第一次相同，实际为 {again}")
+            check(hits == {'/a.png': 1, '/b.png': 1, '/bad.jpg': 2, '/missing.png': 2},
+                  f"只有失败的地址应重新请求，实际为 {hits}")
+
+            thumbnails = make_thumbnails(stored.values(), photo_dir, max_workers=1)
+            check(set(thumbnails) == {stored[a]}, f"应生成一张缩略图，实际为 {thumbnails}")
+            with Image.open(thumbnails[stored[a]]) as image:
+                check(image.size == THUMBNAIL_SIZE, f"缩略图尺寸应为 {THUMBNAIL_SIZE}，实际为 {image.size}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ 自检通过")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="下载榜单人物头像并生成缩略图")
+    parser.add_argument('--workers', type=int, default=8, help="下载线程数")
+    parser.add_argument('--rate', type=float, default=8.0, help="每个域名每秒最多请求数")
+    parser.add_argument('--size', type=int, nargs=2, default=list(THUMBNAIL_SIZE), metavar=('宽', '高'))
+    parser.add_argument('--thumbnail-workers', type=int, default=None, help="生成缩略图的进程数，默认等于CPU核数")
+    parser.add_argument('--self-check', action='store_true', help="用本机的临时 HTTP 服务器检查下载和缓存逻辑后退出")
+    args = parser.parse_args()
+
+    if args.self_check:
+        self_check()
+        raise SystemExit
+
+    start = time.perf_counter()
+    photos = build_photo_table(load_rich_list(), size=tuple(args.size), max_workers=args.workers,
+                               rate=args.rate, thumbnail_workers=args.thumbnail_workers)
+    print(f"\n{photos['缩略图'].notna().sum()} / {len(photos)} 人有缩略图，"
+          f"共耗时 {time.perf_counter() - start:.1f} 秒。")
@@ -0,0 +1,97 @@
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+from 地理编码 import geocode
+from 地图缓存 import load_china_map, MAP_PATH
+
+# 固定网格的经纬度范围 (最小经度, 最小纬度, 最大经度, 最大纬度) 和格子大小（度），
+# 覆盖大陆、海南和台湾；网格固定后平滑的计算量与上榜人数无关
+GRID_EXTENT = (73.0, 17.0, 136.0, 54.0)
+CELL_SIZE = 0.1
+
+# 高斯核的标准差（度），约 50 公里
+DEFAULT_BANDWIDTH = 0.5
+
+
+def _gaussian_smooth(grid, sigma_cells):
+    """
+    用FFT做高斯平滑：高斯核的傅里叶变换仍是高斯函数，直接在频域相乘，
+    不需要显式构造卷积核。四周补零 4σ，避免周期边界让东西两侧的密度互相渗透。
+    """
+    pad = int(np.ceil(4 * sigma_cells))
+    padded = np.pad(grid, pad)
+    freq_y = np.fft.fftfreq(padded.shape[0])[:, None]
+    freq_x = np.fft.rfftfreq(padded.shape[1])[None, :]
+    transfer = np.exp(-2 * (np.pi * sigma_cells) ** 2 * (freq_y ** 2 + freq_x ** 2))
+    smoothed = np.fft.irfft2(np.fft.rfft2(padded) * transfer, s=padded.shape)
+    return smoothed[pad:pad + grid.shape[0], pad:pad + grid.shape[1]]
+
+
+def density_grid(lon, lat, bandwidth=DEFAULT_BANDWIDTH, extent=GRID_EXTENT, cell_size=CELL_SIZE):
+    """
+    把点的经纬度统计到固定网格上（二维直方图），再做高斯平滑，得到核密度估计。
+    返回 (密度矩阵, extent)；矩阵第0行对应最南端，单位是“人/格”，总和约等于落在网格内的人数。
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    valid = ~(np.isnan(lon) | np.isnan(lat))
+    min_x, min_y, max_x, max_y = extent
+    x_edges = np.linspace(min_x, max_x, int(round((max_x - min_x) / cell_size)) + 1)
+    y_edges = np.linspace(min_y, max_y, int(round((max_y - min_y) / cell_size)) + 1)
+    counts, _, _ = np.histogram2d(lat[valid], lon[valid], bins=[y_edges, x_edges])
+    density = _gaussian_smooth(counts, bandwidth / cell_size)
+    # FFT 的舍入误差会留下极小的负数
+    return np.clip(density, 0, None), (x_edges[0], x_edges[-1], y_edges[0], y_edges[-1])
+
+
+def plot_density_heatmap(locations, map_path=MAP_PATH, output_path='富豪分布密度热力图.png',
+                         title='胡润百富榜分布密度热力图', bandwidth=DEFAULT_BANDWIDTH, show=False, dpi=300):
+    """
+    真正的密度热力图：每个人按城市坐标（只知道省份的用省会坐标）落点，
+    平滑后叠加在省界轮廓上。与按省份着色的分级设色图不同，能看出省内的集中程度。
+    """
+    coords = geocode(locations)
+    print(f"已定位 {coords['lon'].notna().sum()} / {len(coords)} 个地址，"
+          f"其中 {(coords['precision'] == 'province').sum()} 个只精确到省份。")
+    density, extent = density_grid(coords['lon'], coords['lat'], bandwidth)
+    gdf_map = load_china_map(map_path, figsize=(15, 12), dpi=dpi)
+
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    fig, ax = plt.subplots(1, 1, figsize=(15, 12))
+    gdf_map.plot(ax=ax, color='#f2f2f2', edgecolor='none')
+    # 密度很低的格子不着色，露出底图
+    masked = np.ma.masked_less(density, density.max() * 0.01)
+    image = ax.imshow(masked, extent=extent, origin='lower', cmap='YlOrRd', alpha=0.85, zorder=2)
+    gdf_map.boundary.plot(ax=ax, color='0.5', linewidth=0.5, zorder=3)
+
+    min_x, min_y, max_x, max_y = gdf_map.total_bounds
+    ax.set_xlim(min_x, max_x)
+    ax.set_ylim(min_y, max_y)
+    ax.axis('off')
+    ax.set_title(title, fontdict={'fontsize': '25', 'fontweight': '3'})
+    ax.annotate('数据来源: 胡润百富榜 | 制图: AI Agent',
+                xy=(0.1, .08), xycoords='figure fraction',
+                ha='left', va='top', fontsize=12, color='#555555')
+    colorbar = fig.colorbar(image, ax=ax, shrink=0.6)
+    colorbar.set_label(f'富豪密度（人/{CELL_SIZE}°格，带宽 {bandwidth}°）')
+
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+    print(f"密度热力图已保存为: {output_path}")
+
+
+if __name__ == '__main__':
+    from 数据加载 import load_rich_list
+
+    parser = argparse.ArgumentParser(description="绘制富豪出生地/企业总部的核密度热力图")
+    parser.add_argument('--column', default='hs_Rank_Rich_ComHeadquarters_Cn', help="地址列名")
+    parser.add_argument('--bandwidth', type=float, default=DEFAULT_BANDWIDTH, help="高斯核标准差（度）")
+    parser.add_argument('--output', default='富豪分布密度热力图.png')
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+
+    df = load_rich_list()
+    plot_density_heatmap(df[args.column], output_path=args.output, bandwidth=args.bandwidth, dpi=args.dpi)
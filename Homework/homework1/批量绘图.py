@@ -0,0 +1,69 @@
+import matplotlib
+matplotlib.use('Agg')  # 必须在导入 pyplot 之前设置：无界面后端，不会弹出窗口
+import time
+import importlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from 数据加载 import load_rich_list, RICH_LIST_XLSX
+from 报表引擎 import compute_reports
+from 地图缓存 import load_china_map, MAP_PATH
+
+# (图表名称, 脚本模块, 绘图函数, 使用的统计结果, 额外参数)
+FIGURE_JOBS = [
+    ('性别分布饼状图', '3问之性别', 'plot_gender_pie', 'gender', {'show': False}),
+    ('年龄分布柱状图', '3问之年龄', 'plot_age_distribution', 'age', {'show': False}),
+    ('出生地热力图', '3问之出生地', 'plot_birthplace_heatmap', 'birthplace', {'map_path': MAP_PATH, 'show': False}),
+    ('企业总部热力图', '3问之企业分布', 'plot_headquarters_heatmap', 'headquarters', {'map_path': MAP_PATH}),
+]
+
+
+def _init_worker():
+    # Windows 下子进程是重新启动的解释器，需要再次指定后端
+    matplotlib.use('Agg')
+
+
+def _render_job(module_name, function_name, report, kwargs):
+    """在子进程中执行一个绘图任务，返回耗时（秒）。"""
+    start = time.perf_counter()
+    plot_function = getattr(importlib.import_module(module_name), function_name)
+    plot_function(report, **kwargs)
+    return time.perf_counter() - start
+
+
+def render_all_figures(path=RICH_LIST_XLSX, max_workers=None):
+    """
+    批量生成 homework1 的全部图表：数据只加载、统计一次，
+    每张图作为一个任务交给进程池并行渲染，最后汇总每张图的耗时。
+    """
+    wall_start = time.perf_counter()
+    df = load_rich_list(path)
+    reports = compute_reports(df, names=sorted({job[3] for job in FIGURE_JOBS}))
+    # 先在主进程里生成地图缓存，避免多个子进程同时重建
+    load_china_map(MAP_PATH)
+
+    timings = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_render_job, module_name, function_name, reports[report_name], kwargs): title
+            for title, module_name, function_name, report_name, kwargs in FIGURE_JOBS
+        }
+        for future in as_completed(futures):
+            title = futures[future]
+            try:
+                timings[title] = future.result()
+            except Exception as e:
+                print(f"❌ 生成 '{title}' 失败: {e}")
+
+    wall_seconds = time.perf_counter() - wall_start
+    print("\n--- 各图表渲染耗时 ---")
+    for title, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"{title}: {seconds:.2f} 秒")
+    print(f"总耗时 {wall_seconds:.2f} 秒（逐张渲染需要约 {sum(timings.values()):.2f} 秒）")
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="并行生成 homework1 的全部图表")
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认等于CPU核数")
+    args = parser.parse_args()
+    render_all_figures(max_workers=args.workers)
@@ -0,0 +1,134 @@
+import importlib
+import time
+import pandas as pd
+from 数据加载 import load_rich_list, RICH_LIST_XLSX
+from 地区解析 import resolve_province
+
+# --- 各报表使用的列名 ---
+industry_column = 'hs_Rank_Rich_Industry_Cn'
+wealth_column = 'hs_Rank_Rich_Wealth'
+person_column = 'hs_Character'
+gender_column = 'hs_Rank_Rich_Gender'
+age_column = 'hs_Rank_Rich_Age'
+birthplace_column = 'hs_Rank_Rich_BirthPlace_Cn'
+headquarters_column = 'hs_Rank_Rich_ComHeadquarters_Cn'
+
+# 一个人同时属于多个行业时用这些符号分隔，例如 '饮料、医疗保健'
+INDUSTRY_SEPARATORS = r'[、,，/;；]'
+
+AGE_BINS = [0, 40, 50, 60, 70, 120]
+AGE_LABELS = ['40岁以下', '40-49岁', '50-59岁', '60-69岁', '70岁及以上']
+
+def industry_report(df):
+    """按行业统计富豪数量和总财富，按总财富降序排列。只取用到的列，不复制整张表。"""
+    # Excel版数据已经展开并删掉了 hs_Character 列，此时按行计数
+    count_column = person_column if person_column in df.columns else wealth_column
+    columns = list(dict.fromkeys([industry_column, wealth_column, count_column]))
+    df_cleaned = df[columns].dropna(subset=[industry_column, wealth_column])
+    df_cleaned = df_cleaned.assign(**{wealth_column: pd.to_numeric(df_cleaned[wealth_column], errors='coerce')})
+    df_cleaned = df_cleaned.dropna(subset=[wealth_column])
+
+    industry_analysis = df_cleaned.groupby(industry_column, observed=True).agg(
+        富豪数量=(count_column, 'count'),
+        行业总财富=(wealth_column, 'sum')
+    )
+
+    industry_analysis = industry_analysis.reset_index()
+    industry_analysis_sorted = industry_analysis.sort_values(by='行业总财富', ascending=False)
+    return industry_analysis_sorted.rename(columns={industry_column: '行业'})
+
+
+def explode_industries(df, column=industry_column):
+    """
+    把含多个行业的行拆成每个行业一行（同一行里重复的行业只保留一次），其他列原样复制。
+    这样一个人会在他涉及的每个行业中各计数一次。
+    """
+    industries = df[column].astype(str).str.split(INDUSTRY_SEPARATORS, regex=True)
+    exploded = df.assign(**{column: industries}).explode(column)
+    exploded[column] = exploded[column].str.strip()
+    exploded = exploded[exploded[column] != '']
+    return exploded[~exploded.reset_index().duplicated(subset=['index', column]).to_numpy()]
+
+
+def gender_report(df, column=gender_column):
+    """统计性别分布，排除'未知'和空值。"""
+    genders = df[column]
+    gender_counts = genders[genders.notna() & (genders != '未知')].value_counts()
+    # category 类型的 value_counts 会带上数量为0的类别，需要去掉
+    return gender_counts[gender_counts > 0]
+
+
+def age_report(df, column=age_column):
+    """按年龄分段统计人数，'未知'年龄单独作为一项放在最后。"""
+    ages = df[column].dropna()
+    unknown_count = (ages == '未知').sum()
+
+    numeric_ages = pd.to_numeric(ages, errors='coerce').dropna().astype(int)
+    age_groups = pd.cut(numeric_ages, bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    age_distribution = age_groups.value_counts().sort_index()
+
+    if unknown_count > 0:
+        unknown_series = pd.Series({'年龄未知': unknown_count})
+        return pd.concat([age_distribution, unknown_series])
+    return age_distribution
+
+
+def _province_counts(provinces):
+    province_counts = provinces.dropna().value_counts().reset_index()
+    province_counts.columns = ['province', 'count']
+    return province_counts
+
+
+def birthplace_report(df, column=birthplace_column):
+    """统计出生地省份分布，数据格式为 '中国-福建-龙岩'，国外出生地会被排除。"""
+    return _province_counts(resolve_province(df[column]))
+
+
+def headquarters_report(df, column=headquarters_column):
+    """统计企业总部所在省份分布，国外地址无法匹配省份会被排除。"""
+    return _province_counts(resolve_province(df[column]))
+
+
+# 报表名 -> 统计函数。新增一个报表只需要在这里登记，数据仍然只读取一次；
+# 每个统计函数只读取自己需要的列
+REPORTS = {
+    'industry': industry_report,
+    'gender': gender_report,
+    'age': age_report,
+    'birthplace': birthplace_report,
+    'headquarters': headquarters_report,
+}
+
+
+def compute_reports(df, names=None):
+    """
+    在同一份已加载的数据上计算所有（或指定的）报表，返回 {报表名: 统计结果}。
+    注意这不是对数据的一次遍历：每个报表对自己用到的一两列各做一次向量化统计。
+    在 pandas 里把五种统计合并成一次逐行遍历反而更慢，省下的是重复读取和解析文件。
+    """
+    names = list(REPORTS) if names is None else names
+    return {name: REPORTS[name](df) for name in names}
+
+
+def run_all_reports(path=RICH_LIST_XLSX, map_path='中华人民共和国.json', show=False):
+    """
+    只读取一次数据，全部报表都用这一份 DataFrame 计算，再交给各个脚本原有的画图/写Excel函数输出。
+    这些输出函数只接收统计结果，不会再读取数据文件。
+    """
+    start = time.perf_counter()
+    df = load_rich_list(path)
+    results = compute_reports(df)
+    print(f"数据加载与全部统计耗时 {time.perf_counter() - start:.2f} 秒。")
+
+    # 脚本文件名以数字开头，只能用 importlib 导入
+    importlib.import_module('2问筛选').write_industry_report(results['industry'])
+    importlib.import_module('3问之性别').plot_gender_pie(results['gender'], show=show)
+    importlib.import_module('3问之年龄').plot_age_distribution(results['age'], show=show)
+    importlib.import_module('3问之出生地').plot_birthplace_heatmap(results['birthplace'], map_path, show=show)
+    importlib.import_module('3问之企业分布').plot_headquarters_heatmap(results['headquarters'], map_path)
+    print("\n🎉 全部报表生成完毕！")
+    return results
+
+
+if __name__ == '__main__':
+    run_all_reports()
@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+RICH_LIST_XLSX = '胡润百富榜完整数据2.0.xlsx'
+
+CACHE_DIR = '缓存'
+
+# 取值重复度很高的列，缓存时存成 category 类型，体积小、分组统计也更快
+CATEGORY_COLUMNS = [
+    'hs_Rank_Rich_Gender',
+    'hs_Rank_Rich_Industry_Cn', 'hs_Rank_Rich_Industry_En',
+    'hs_Rank_Rich_BirthPlace_Cn', 'hs_Rank_Rich_BirthPlace_En',
+    'hs_Rank_Rich_NativePlace_Cn', 'hs_Rank_Rich_NativePlace_En',
+    'hs_Rank_Rich_Permanent_Cn', 'hs_Rank_Rich_Permanent_En',
+    'hs_Rank_Rich_ComHeadquarters_Cn', 'hs_Rank_Rich_ComHeadquarters_En',
+    'hs_Rank_Rich_Education_Cn', 'hs_Rank_Rich_Education_En',
+]
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    # 没有安装 pyarrow 时退回 pandas 自带的 pickle，同样比重新解析Excel快得多
+    CACHE_FORMAT = 'pickle'
+
+
+def _file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _cache_paths(source_path, cache_dir):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    data_path = os.path.join(cache_dir, f'{name}.{CACHE_FORMAT}')
+    meta_path = os.path.join(cache_dir, f'{name}.meta.json')
+    return data_path, meta_path
+
+
+def _to_typed_frame(df):
+    """把Excel读出的表格转换成适合列式存储的类型。"""
+    df = df.copy()
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif df[column].dtype == object:
+            # 混合了数字和文字的列（例如年龄里的'未知'）统一存成字符串，空值保持为空
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+
+def _is_cache_valid(source_path, data_path, meta_path):
+    """源文件的修改时间和大小没变则缓存有效；变了再比较内容哈希，只是被'碰了一下'也不重建。"""
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return False
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != CACHE_FORMAT:
+        return False
+
+    stat = os.stat(source_path)
+    if meta.get('mtime') == stat.st_mtime and meta.get('size') == stat.st_size:
+        return True
+    if meta.get('sha1') == _file_sha1(source_path):
+        meta.update(mtime=stat.st_mtime, size=stat.st_size)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        return True
+    return False
+
+
+def load_rich_list(path=RICH_LIST_XLSX, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    读取胡润榜单Excel。第一次读取后会在 cache_dir 里保存一份列式缓存（Parquet），
+    之后只要源文件没有变化就直接读缓存，不再用 openpyxl 解析整个工作簿。
+    源文件不存在时抛出 FileNotFoundError，与 pd.read_excel 一致。
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    if not use_cache:
+        return _to_typed_frame(pd.read_excel(path))
+
+    data_path, meta_path = _cache_paths(path, cache_dir)
+    if _is_cache_valid(path, data_path, meta_path):
+        if CACHE_FORMAT == 'parquet':
+            return pd.read_parquet(data_path)
+        return pd.read_pickle(data_path)
+
+    print(f"正在解析 '{path}' 并生成缓存（只在源文件变化后执行一次）...")
+    df = _to_typed_frame(pd.read_excel(path))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(data_path, index=False)
+    else:
+        df.to_pickle(data_path)
+    stat = os.stat(path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': CACHE_FORMAT, 'mtime': stat.st_mtime, 'size': stat.st_size,
+                   'sha1': _file_sha1(path)}, f)
+    return df
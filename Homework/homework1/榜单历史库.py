@@ -0,0 +1,257 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from 数据加载 import load_rich_list
+
+HISTORY_PATH = '胡润榜单历史库.npz'
+
+id_column = 'hs_Rank_Rich_Cha_ID'
+name_column = 'hs_Rank_Rich_ChaName_Cn'
+company_column = 'hs_Rank_Rich_ComName_Cn'
+year_column = 'hs_Rank_Rich_Year'
+wealth_column = 'hs_Rank_Rich_Wealth'
+rank_column = 'hs_Rank_Rich_Ranking'
+
+
+# 财富（亿元）以 0.01 亿元为单位的整数保存，整数差分再累加可以精确还原
+WEALTH_SCALE = 100
+
+
+def _to_fixed(wealth):
+    return np.round(np.nan_to_num(wealth) * WEALTH_SCALE).astype(np.int64)
+
+
+def _from_fixed(fixed):
+    return fixed / WEALTH_SCALE
+
+
+def _quantize(wealth):
+    """把财富取整到保存的精度，内存中的值与保存再读取后的值完全相同。"""
+    return np.where(np.isnan(wealth), np.nan, _from_fixed(_to_fixed(wealth)))
+
+
+def _to_str_array(values):
+    """姓名、企业中的空值保存为空字符串（而不是 'None'、'nan'）。"""
+    return np.array(['' if pd.isna(value) else str(value) for value in values], dtype=str)
+
+
+def _from_str_array(values):
+    values = values.astype(object)
+    values[values == ''] = np.nan
+    return values
+
+
+def _delta_encode(matrix):
+    """按年份方向做差分编码：第一列保存原值，之后每列保存与上一列的差。"""
+    deltas = matrix.copy()
+    deltas[:, 1:] = np.diff(matrix, axis=1)
+    return deltas
+
+
+def _delta_decode(deltas):
+    return np.cumsum(deltas, axis=1)
+
+
+def _forward_fill(matrix, present):
+    """缺席年份沿用上一次的值（首次上榜前记为0），让差分后出现大量0，压缩率更高。"""
+    filled = np.where(present, matrix, 0)
+    last_seen = np.where(present, np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(last_seen, axis=1, out=last_seen)
+    return np.take_along_axis(filled, last_seen, axis=1)
+
+
+class RichListHistory:
+    """
+    多年榜单历史库。每个人物（按 hs_Rank_Rich_Cha_ID 识别，夫妇/家族为同一条记录）一行，
+    每次榜单发布一列；财富和排名以差分编码的数组保存在一个压缩的 .npz 文件中。
+    读取时建立 人物ID/姓名 -> 行号 的索引，查询不需要扫描各年的快照。
+    """
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self.releases = []                                  # 各次榜单的年份，升序
+        self.keys = np.empty(0, dtype=object)               # 人物ID
+        self.names = np.empty(0, dtype=object)              # 最近一次上榜时的姓名
+        self.companies = np.empty(0, dtype=object)          # 最近一次上榜时的企业
+        self.wealth = np.empty((0, 0), dtype=np.float64)    # 财富（亿元），未上榜或缺失为 NaN
+        self.rank = np.empty((0, 0), dtype=np.int32)        # 排名
+        self.present = np.empty((0, 0), dtype=bool)         # 该年是否上榜
+        if os.path.exists(path):
+            self._load()
+        self._build_index()
+
+    def _load(self):
+        with np.load(self.path) as data:
+            self.releases = data['releases'].tolist()
+            self.keys = data['keys'].astype(object)
+            self.names = _from_str_array(data['names'])
+            self.companies = _from_str_array(data['companies'])
+            self.present = np.unpackbits(data['present_bits'], axis=1,
+                                         count=len(self.releases)).astype(bool)
+            # 上榜但财富缺失的格子由 wealth_known 区分，读回来仍是 NaN
+            wealth_known = np.unpackbits(data['wealth_known_bits'], axis=1,
+                                         count=len(self.releases)).astype(bool)
+            self.wealth = np.where(wealth_known, _from_fixed(_delta_decode(data['wealth_deltas'])), np.nan)
+            self.rank = np.where(self.present, _delta_decode(data['rank_deltas']), 0).astype(np.int32)
+
+    def save(self):
+        wealth_known = ~np.isnan(self.wealth)
+        wealth_deltas = _delta_encode(_forward_fill(_to_fixed(self.wealth), wealth_known))
+        rank_deltas = _delta_encode(_forward_fill(self.rank, self.present))
+
+        # 编码必须能原样还原内存中的数据，否则不写入文件（不用 assert，python -O 时也要检查）
+        decoded_wealth = np.where(wealth_known, _from_fixed(_delta_decode(wealth_deltas)), np.nan)
+        decoded_rank = np.where(self.present, _delta_decode(rank_deltas), 0)
+        if not np.array_equal(decoded_wealth, self.wealth, equal_nan=True):
+            raise ValueError("财富编码无法精确还原，未写入历史库")
+        if not np.array_equal(decoded_rank, self.rank):
+            raise ValueError("排名编码无法精确还原，未写入历史库")
+
+        np.savez_compressed(
+            self.path,
+            releases=np.array(self.releases, dtype=np.int32),
+            keys=self.keys.astype(str),
+            names=_to_str_array(self.names),
+            companies=_to_str_array(self.companies),
+            present_bits=np.packbits(self.present, axis=1),
+            wealth_known_bits=np.packbits(wealth_known, axis=1),
+            wealth_deltas=wealth_deltas,
+            rank_deltas=rank_deltas,
+        )
+        print(f"历史库已保存至 '{self.path}'：{len(self.keys)} 人，{len(self.releases)} 次榜单。")
+
+    def _build_index(self):
+        self.key_index = {key: row for row, key in enumerate(self.keys)}
+        self.name_index = {}
+        for row, name in enumerate(self.names):
+            self.name_index.setdefault(name, []).append(row)
+
+    def ingest(self, df, release=None):
+        """
+        导入一次榜单快照。release 默认取数据中的 hs_Rank_Rich_Year；
+        已存在的年份会被新数据整列替换，新出现的人物追加到末尾。
+        """
+        if release is None:
+            release = int(df[year_column].mode().iloc[0])
+        snapshot = df.dropna(subset=[id_column]).drop_duplicates(subset=[id_column])
+        snapshot_keys = snapshot[id_column].astype(str).to_numpy(dtype=object)
+
+        # 新年份插入到有序位置
+        if release not in self.releases:
+            column = int(np.searchsorted(self.releases, release))
+            self.releases.insert(column, release)
+            self.wealth = np.insert(self.wealth, column, np.nan, axis=1)
+            self.rank = np.insert(self.rank, column, 0, axis=1)
+            self.present = np.insert(self.present, column, False, axis=1)
+        column = self.releases.index(release)
+
+        # 新人物追加行
+        new_keys = [key for key in pd.unique(snapshot_keys) if key not in self.key_index]
+        if new_keys:
+            n_new, n_releases = len(new_keys), len(self.releases)
+            self.keys = np.concatenate([self.keys, np.array(new_keys, dtype=object)])
+            self.names = np.concatenate([self.names, np.empty(n_new, dtype=object)])
+            self.companies = np.concatenate([self.companies, np.empty(n_new, dtype=object)])
+            self.wealth = np.vstack([self.wealth, np.full((n_new, n_releases), np.nan)])
+            self.rank = np.vstack([self.rank, np.zeros((n_new, n_releases), dtype=np.int32)])
+            self.present = np.vstack([self.present, np.zeros((n_new, n_releases), dtype=bool)])
+            self._build_index()
+
+        rows = np.array([self.key_index[key] for key in snapshot_keys], dtype=np.int64)
+        self.wealth[:, column] = np.nan
+        self.rank[:, column] = 0
+        self.present[:, column] = False
+        self.wealth[rows, column] = _quantize(pd.to_numeric(snapshot[wealth_column], errors='coerce').to_numpy())
+        self.rank[rows, column] = pd.to_numeric(snapshot[rank_column], errors='coerce').fillna(0).to_numpy()
+        self.present[rows, column] = True
+
+        # 姓名、企业以每个人最近一次上榜的信息为准
+        latest = ~self.present[rows, column + 1:].any(axis=1)
+        self.names[rows[latest]] = snapshot[name_column].to_numpy(dtype=object)[latest]
+        self.companies[rows[latest]] = snapshot[company_column].to_numpy(dtype=object)[latest]
+        self._build_index()
+        print(f"已导入 {release} 年榜单：{len(rows)} 人，其中新上榜 {len(new_keys)} 人。")
+
+    def _rows_for(self, person):
+        person = str(person)
+        if person in self.key_index:
+            return [self.key_index[person]]
+        return self.name_index.get(person, [])
+
+    def trajectory(self, person):
+        """按人物ID或姓名查询历年财富和排名，未上榜的年份不出现在结果中。"""
+        frames = []
+        for row in self._rows_for(person):
+            present = self.present[row]
+            frames.append(pd.DataFrame({
+                '人物ID': self.keys[row],
+                '姓名': self.names[row],
+                '年份': np.array(self.releases)[present],
+                '财富(亿元)': self.wealth[row, present],
+                '排名': self.rank[row, present],
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['人物ID', '姓名', '年份', '财富(亿元)', '排名'])
+        return pd.concat(frames, ignore_index=True)
+
+    def top_movers(self, release_a, release_b, k=20, by='wealth'):
+        """
+        两次榜单之间变化最大的人物（两次都上榜的人）。
+        by='wealth' 按财富变化排序（增加最多在前），by='rank' 按排名上升的名次排序。
+        """
+        a, b = self.releases.index(release_a), self.releases.index(release_b)
+        both = np.flatnonzero(self.present[:, a] & self.present[:, b])
+        if by == 'wealth':
+            change = self.wealth[both, b] - self.wealth[both, a]
+        else:
+            change = (self.rank[both, a] - self.rank[both, b]).astype(np.float64)
+        k = min(k, len(both))
+        top = np.argpartition(-change, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+        top = top[np.argsort(-change[top])]
+        rows = both[top]
+        return pd.DataFrame({
+            '人物ID': self.keys[rows],
+            '姓名': self.names[rows],
+            '企业': self.companies[rows],
+            f'{release_a}财富': self.wealth[rows, a],
+            f'{release_b}财富': self.wealth[rows, b],
+            f'{release_a}排名': self.rank[rows, a],
+            f'{release_b}排名': self.rank[rows, b],
+            '变化': change[top],
+        })
+
+
+def _read_snapshot(path):
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return load_rich_list(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="胡润榜单多年历史库")
+    parser.add_argument('--store', default=HISTORY_PATH, help="历史库文件路径")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="导入一次榜单（CSV或Excel）")
+    ingest_parser.add_argument('path')
+    ingest_parser.add_argument('--year', type=int, default=None, help="榜单年份，默认读取数据中的年份")
+
+    trajectory_parser = subparsers.add_parser('trajectory', help="查询某人的历年财富")
+    trajectory_parser.add_argument('person', help="人物ID或姓名")
+
+    movers_parser = subparsers.add_parser('movers', help="两次榜单之间变化最大的人")
+    movers_parser.add_argument('release_a', type=int)
+    movers_parser.add_argument('release_b', type=int)
+    movers_parser.add_argument('-k', type=int, default=20)
+    movers_parser.add_argument('--by', choices=['wealth', 'rank'], default='wealth')
+
+    args = parser.parse_args()
+    history = RichListHistory(args.store)
+    if args.command == 'ingest':
+        history.ingest(_read_snapshot(args.path), args.year)
+        history.save()
+    elif args.command == 'trajectory':
+        print(history.trajectory(args.person).to_string(index=False))
+    else:
+        print(history.top_movers(args.release_a, args.release_b, args.k, args.by).to_string(index=False))
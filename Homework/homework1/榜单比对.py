@@ -0,0 +1,122 @@
+import ast
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+# 用人物ID识别同一个人（夫妇/家族为同一条记录），两次爬取之间保持不变
+KEY_COLUMN = 'hs_Rank_Rich_Cha_ID'
+
+# 每次发布都会变化、与内容无关的列，比较时忽略
+IGNORED_COLUMNS = ['hs_Rank_Rich_MTime']
+
+# 保存为字符串形式的嵌套结构（列表/字典），比较前统一序列化，避免键的顺序不同被当成修改
+NESTED_COLUMNS = ['hs_Character']
+
+
+def _canonical_nested(text):
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def normalize_records(df, key_column=KEY_COLUMN, ignored_columns=IGNORED_COLUMNS):
+    """
+    把一次爬取的结果整理成可比较的形式：所有值转为去掉首尾空白的字符串（空值为''），
+    '3500.0' 与 '3500' 视为相同，嵌套列按键排序重新序列化，以人物ID为索引、列按名称排序。
+    """
+    df = df.drop(columns=[c for c in ignored_columns if c in df.columns])
+    df = df.astype(object).where(df.notna(), '').astype(str)
+    df = df.apply(lambda column: column.str.strip().str.replace(r'^(-?\d+)\.0+$', r'\1', regex=True))
+    for column in NESTED_COLUMNS:
+        if column in df.columns:
+            # 同样的字符串只解析一次
+            codes, uniques = pd.factorize(df[column])
+            df[column] = np.array([_canonical_nested(text) for text in uniques], dtype=object)[codes]
+
+    duplicated = df[key_column].duplicated(keep='last')
+    if duplicated.any():
+        print(f"⚠️ 有 {duplicated.sum()} 条记录的 {key_column} 重复，只保留最后一条。")
+    df = df[~duplicated].set_index(key_column)
+    return df[sorted(df.columns)]
+
+
+def hash_records(df):
+    """对每一行计算64位内容哈希，值相同的行哈希相同。"""
+    return pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df.index)
+
+
+def diff_releases(old, new, key_column=KEY_COLUMN):
+    """
+    比较两次爬取（原始表格即可），返回字典：
+    'added' 新上榜的人、'removed' 落榜的人、'changed' 内容有变化的人（新数据），
+    'fields' 字段级变化的长表格（人物ID、字段、旧值、新值）。
+    先用整行哈希找出变化的行，只对这些行逐字段比较，所以开销主要取决于变化的行数。
+    """
+    old = normalize_records(old, key_column)
+    new = normalize_records(new, key_column)
+
+    # 两次爬取的列可能不同（API 增删字段），缺失的列按空值比较
+    columns = sorted(set(old.columns) | set(new.columns))
+    old = old.reindex(columns=columns, fill_value='')
+    new = new.reindex(columns=columns, fill_value='')
+
+    old_hashes, new_hashes = hash_records(old), hash_records(new)
+    added_keys = new.index.difference(old.index, sort=False)
+    removed_keys = old.index.difference(new.index, sort=False)
+    common_keys = new.index.intersection(old.index, sort=False)
+    changed_keys = common_keys[old_hashes.loc[common_keys].to_numpy() != new_hashes.loc[common_keys].to_numpy()]
+
+    old_changed, new_changed = old.loc[changed_keys], new.loc[changed_keys]
+    different = (old_changed != new_changed).to_numpy()
+    rows, cols = np.nonzero(different)
+    fields = pd.DataFrame({
+        key_column: changed_keys[rows],
+        '字段': np.array(columns, dtype=object)[cols],
+        '旧值': old_changed.to_numpy()[rows, cols],
+        '新值': new_changed.to_numpy()[rows, cols],
+    })
+
+    return {
+        'added': new.loc[added_keys].reset_index(),
+        'removed': old.loc[removed_keys].reset_index(),
+        'changed': new_changed.reset_index(),
+        'fields': fields,
+    }
+
+
+def print_summary(diff, key_column=KEY_COLUMN):
+    print(f"新增 {len(diff['added'])} 人，移除 {len(diff['removed'])} 人，"
+          f"变化 {len(diff['changed'])} 人（共 {len(diff['fields'])} 处字段变化）。")
+    if len(diff['fields']):
+        print("\n变化最多的字段：")
+        print(diff['fields']['字段'].value_counts().head(10).to_string())
+
+
+def write_diff(diff, output_path):
+    """把比对结果写入Excel，每类结果一个工作表。"""
+    sheet_names = {'added': '新增', 'removed': '移除', 'changed': '变化', 'fields': '字段变化'}
+    with pd.ExcelWriter(output_path) as writer:
+        for name, sheet_name in sheet_names.items():
+            diff[name].to_excel(writer, sheet_name=sheet_name, index=False)
+    print(f"比对结果已保存至: {output_path}")
+
+
+def read_crawl(path):
+    # 全部按字符串读取，避免两次爬取因为空值不同而推断出不同的数值类型
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="比较两次爬取的胡润榜单CSV")
+    parser.add_argument('old', help="旧的爬取结果CSV")
+    parser.add_argument('new', help="新的爬取结果CSV")
+    parser.add_argument('--output', default=None, help="把比对结果保存为Excel")
+    args = parser.parse_args()
+
+    diff = diff_releases(read_crawl(args.old), read_crawl(args.new))
+    print_summary(diff)
+    if args.output:
+        write_diff(diff, args.output)
@@ -2,49 +2,247 @@ import requests
 import pandas as pd
 import time
 import json # 导入json模块，用于美化打印JSON
+import threading
+import argparse
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from 爬取日志 import CrawlJournal, DEFAULT_JOURNAL_PATH
 
-def scrape_full_rich_list():
+BASE_API_URL = "https://www.hurun.net/zh-CN/Rank/HsRankDetailsList?num=ODBYW2BI&search=&offset={offset}&limit={limit}"
+
+PAGE_LIMIT = 20
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://www.hurun.net/zh-CN/Rank/HsRankDetails?pagetype=rich',
+}
+
+OUTPUT_FILENAME = "胡润百富榜完整数据.csv"
+
+
+class HostTokenBucket:
+    """
+    按域名限速的令牌桶：每个域名每秒补充 rate 个令牌，最多积攒 burst 个。
+    取代原来固定的 time.sleep(0.5)，并发时也不会超过设定的请求速率。
+    """
+
+    def __init__(self, rate=4.0, burst=4):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> [剩余令牌, 上次补充时间]
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_session(pool_size=8):
+    """创建带连接池和自动重试的会话，所有并发请求复用同一批TCP连接。"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def extract_rows(data):
+    """从API返回的JSON中取出 'rows' 列表，结构不符合预期时抛出 ValueError。"""
+    if 'rows' not in data:
+        raise ValueError(f"JSON响应中未找到 'rows' 键。根级别键: {list(data.keys())}")
+    rows = data['rows']
+    if not isinstance(rows, list):
+        raise ValueError(f"'rows' 存在，但它不是一个列表。实际类型: {type(rows)}")
+    return rows
+
+
+def fetch_page(session, offset, limit=PAGE_LIMIT, rate_limiter=None, etag=None):
+    """
+    请求单页数据，返回 (解析后的JSON, ETag)。
+    传入上次的 etag 时发送条件请求，服务器返回 304（内容未变）时JSON为 None。
+    """
+    url = BASE_API_URL.format(offset=offset, limit=limit)
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    request_headers = {'If-None-Match': etag} if etag else None
+    response = session.get(url, headers=request_headers, timeout=20)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return response.json(), response.headers.get('ETag')
+
+
+def scrape_rows_concurrent(limit=PAGE_LIMIT, max_workers=8, rate=4.0, burst=4, journal=None, refresh=False):
+    """
+    并发模式：先请求第一页拿到 'total' 总条数，再把剩余的 offset 分发给线程池并发抓取，
+    最后按 offset 重新排序，保证结果顺序与逐页爬取一致。
+    传入 journal 时每页抓完立即写入日志，只抓日志中缺失的页；refresh=True 时重新请求所有页，
+    但只有内容哈希变化的页才会写入日志。
+    返回 (记录列表, 失败的offset列表)；第一页失败或响应里没有 'total' 时返回 (None, None)。
+    """
+    session = create_session(pool_size=max_workers)
+    rate_limiter = HostTokenBucket(rate=rate, burst=burst)
+    pages = {}
+    changed_count = 0
+
+    print("--- 开始爬取完整榜单（并发模式）---")
+    total = journal.total if journal is not None else None
+    if total is None or refresh:
+        etag = journal.get_etag(0) if journal is not None else None
+        try:
+            first_page, etag = fetch_page(session, 0, limit, rate_limiter, etag)
+            if first_page is not None:
+                pages[0] = extract_rows(first_page)
+                total = first_page.get('total')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"❌ 错误: 请求第一页失败: {e}")
+            return None, None
+
+        if not isinstance(total, int):
+            print("⚠️ 响应中没有 'total' 字段，无法预先确定页数。")
+            return None, None
+        if journal is not None:
+            journal.set_total(total)
+            if 0 in pages and journal.record_page(0, pages[0], etag):
+                changed_count += 1
+
+    if journal is not None and not refresh:
+        offsets = journal.missing_offsets(total, limit)
+    else:
+        offsets = list(range(limit, total, limit))
+    offsets = [offset for offset in offsets if offset not in pages]
+    print(f"榜单共 {total} 条记录，{len(offsets)} 页将以 {max_workers} 个线程并发抓取...")
+
+    failed_offsets = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for offset in offsets:
+            etag = journal.get_etag(offset) if journal is not None and refresh else None
+            futures[executor.submit(fetch_page, session, offset, limit, rate_limiter, etag)] = offset
+        for future in as_completed(futures):
+            offset = futures[future]
+            page_num = (offset // limit) + 1
+            try:
+                data, etag = future.result()
+                if data is None:
+                    print(f"✅ 第 {page_num} 页: 内容未变化 (304)。")
+                    continue
+                pages[offset] = extract_rows(data)
+                print(f"✅ 第 {page_num} 页: 获取 {len(pages[offset])} 条记录。")
+                # 日志只在主线程里写，避免多个线程同时追加文件
+                if journal is not None and journal.record_page(offset, pages[offset], etag):
+                    changed_count += 1
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"❌ 错误: 请求第 {page_num} 页失败: {e}")
+                failed_offsets.append(offset)
+
+    session.close()
+
+    if journal is not None:
+        if refresh:
+            print(f"刷新完成：{changed_count} 页内容发生变化并已写入日志。")
+        return journal.records(), sorted(failed_offsets)
+
+    # 按 offset 重新排序，还原榜单原始顺序
+    all_records = []
+    for offset in sorted(pages):
+        all_records.extend(pages[offset])
+    return all_records, sorted(failed_offsets)
+
+
+def save_records(all_records, output_filename=OUTPUT_FILENAME):
+    """把爬取到的记录整理成表格并保存为CSV。"""
+    print("\n--- 数据整合 ---")
+    print(f"总计爬取到 {len(all_records)} 条记录。")
+    df = pd.DataFrame(all_records)
+    print("正在将数据转换为表格...")
+
+    df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+
+    print(f"\n🎉🎉🎉 任务圆满完成！ 🎉🎉🎉")
+    print(f"所有数据已保存至文件: '{output_filename}'")
+
+    print("\n数据预览 (前5行):")
+    print(df.head())
+    return df
+
+
+def scrape_full_rich_list(concurrent=False, max_workers=8, rate=4.0, journal_path=None, refresh=False):
     """
     通过循环调用API来获取完整的胡润榜单数据，并自动处理分页。
+    concurrent=True 时使用并发模式（见 scrape_rows_concurrent），失败时自动退回逐页爬取。
+    journal_path 不为空时启用爬取日志：每页写入磁盘，重新运行从第一个缺失的页继续；
+    refresh=True 时重新请求所有页，只把内容有变化的页写入日志。
     """
-    
-    base_api_url = "https://www.hurun.net/zh-CN/Rank/HsRankDetailsList?num=ODBYW2BI&search=&offset={offset}&limit={limit}"
-    
-    limit = 20
+
+    limit = PAGE_LIMIT
     offset = 0
-    
+
     all_records = []
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Referer': 'https://www.hurun.net/zh-CN/Rank/HsRankDetails?pagetype=rich',
-    }
+
+    journal = CrawlJournal(journal_path) if journal_path else None
+    if journal is not None and not refresh:
+        if journal.is_complete(limit):
+            print("✅ 爬取日志中已有完整榜单，无需联网。")
+            return save_records(journal.records())
+        offset = journal.first_missing_offset(limit)
+        if offset > 0:
+            print(f"从爬取日志恢复：已有 {len(journal.pages)} 页，从 offset={offset} 继续。")
+
+    if concurrent:
+        records, failed_offsets = scrape_rows_concurrent(limit=limit, max_workers=max_workers, rate=rate,
+                                                         journal=journal, refresh=refresh)
+        if records is not None:
+            if journal is not None:
+                journal.compact()
+            if failed_offsets:
+                print(f"⚠️ 以下 offset 抓取失败，结果不完整: {failed_offsets}")
+            if not records:
+                print("\n--- 任务失败 ---")
+                print("未能爬取到任何数据，请检查网络或API是否已变更。")
+                return
+            return save_records(records)
+        print("⚠️ 并发模式不可用，退回逐页爬取。")
 
     print("--- 开始爬取完整榜单（自动翻页）---")
-    
+
     while True:
-        current_url = base_api_url.format(offset=offset, limit=limit)
-        
+        current_url = BASE_API_URL.format(offset=offset, limit=limit)
+
         page_num = (offset // limit) + 1
         print(f"\n正在爬取第 {page_num} 页数据...")
         print(f"URL: {current_url}")
-        
+
         try:
-            response = requests.get(current_url, headers=headers, timeout=20)
+            response = requests.get(current_url, headers=HEADERS, timeout=20)
             response.raise_for_status() # 检查HTTP状态码，如果不是200则抛出异常
             data = response.json()
 
             # --- 调试步骤：打印完整的JSON响应以确认结构 ---
             # 请在遇到问题时取消注释下面两行，查看API返回的实际JSON结构
             # print("--- 原始JSON响应（用于调试）---")
-            # print(json.dumps(data, indent=2, ensure_ascii=False)) 
+            # print(json.dumps(data, indent=2, ensure_ascii=False))
             # print("----------------------------")
             # --- 调试结束 ---
 
             # 根据您提供的JSON片段，假定完整的富豪列表仍在 'data' -> 'rows' 路径下
             # 但我们会更谨慎地检查每一个层级
-            
+
             if 'rows' in data: # 直接检查根级别是否有 'rows' 键
                 new_records = data['rows'] # 直接从根级别获取 'rows'
                 if not isinstance(new_records, list):
@@ -58,14 +256,22 @@ def scrape_full_rich_list():
             # --- 判断是否到达最后一页 ---
             if not new_records:
                 print("\n✅ 数据全部加载完毕，没有新内容了。")
+                if journal is not None:
+                    journal.mark_end(offset)
                 break # 如果返回的数据为空，说明已经爬完了，退出循环
-                
+
             print(f"✅ 成功获取 {len(new_records)} 条新记录。")
             all_records.extend(new_records)
-            
+            if journal is not None and not journal.record_page(offset, new_records):
+                print("（内容与日志中的相同，未写入）")
+
             # 准备下一页
             offset += limit
-            
+
+            # 已有日志时跳过日志中已经存在的页（刷新模式除外）
+            if journal is not None and not refresh:
+                offset = journal.first_missing_offset(limit)
+
             # 礼貌性地暂停一下
             time.sleep(0.5)
 
@@ -81,25 +287,43 @@ def scrape_full_rich_list():
             break
 
 
+    if journal is not None:
+        # 日志里包含本次和之前运行抓到的全部页；压缩日志，刷新多次后文件也不会一直变大
+        all_records = journal.records()
+        journal.compact()
+
     if not all_records:
         print("\n--- 任务失败 ---")
         print("未能爬取到任何数据，请检查网络或API是否已变更。")
         return
 
-    print("\n--- 数据整合 ---")
-    print(f"总计爬取到 {len(all_records)} 条记录。")
-    df = pd.DataFrame(all_records)
-    print("正在将数据转换为表格...")
-
-    output_filename = "胡润百富榜完整数据.csv"
-    df.to_csv(output_filename, index=False, encoding='utf-8-sig')
-
-    print(f"\n🎉🎉🎉 任务圆满完成！ 🎉🎉🎉")
-    print(f"所有数据已保存至文件: '{output_filename}'")
-    
-    print("\n数据预览 (前5行):")
-    print(df.head())
+    return save_records(all_records)
 
 # --- 程序主入口 ---
 if __name__ == '__main__':
-    scrape_full_rich_list()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="爬取胡润百富榜完整数据")
+    parser.add_argument('--concurrent', action='store_true', help="并发抓取（按 total 预先分配所有 offset）")
+    parser.add_argument('--workers', type=int, default=8, help="并发线程数")
+    parser.add_argument('--rate', type=float, default=4.0, help="每秒最多请求数")
+    parser.add_argument('--journal', nargs='?', const=DEFAULT_JOURNAL_PATH, default=None,
+                        help="启用爬取日志（断点续爬），可指定日志文件路径")
+    parser.add_argument('--refresh', action='store_true', help="重新请求所有页，只记录内容有变化的页")
+    parser.add_argument('--diff', nargs='?', const='胡润榜单变化.xlsx', default=None,
+                        help="与上一次保存的CSV比较，列出新增/移除/变化的人，并把结果保存为Excel")
+    args = parser.parse_args()
+
+    previous = None
+    if args.diff:
+        from 榜单比对 import read_crawl, diff_releases, print_summary, write_diff
+        try:
+            previous = read_crawl(OUTPUT_FILENAME)
+        except FileNotFoundError:
+            print(f"没有找到上一次的爬取结果 '{OUTPUT_FILENAME}'，本次不做比较。")
+
+    df = scrape_full_rich_list(concurrent=args.concurrent, max_workers=args.workers, rate=args.rate,
+                               journal_path=args.journal, refresh=args.refresh)
+    if previous is not None and df is not None:
+        print("\n--- 与上一次爬取比较 ---")
+        diff = diff_releases(previous, read_crawl(OUTPUT_FILENAME))
+        print_summary(diff)
+        write_diff(diff, args.diff)
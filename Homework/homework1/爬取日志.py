@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+
+DEFAULT_JOURNAL_PATH = '胡润榜单爬取日志.jsonl'
+
+
+def hash_rows(rows):
+    """对一页记录计算内容哈希（键排序后序列化），用来判断该页是否发生变化。"""
+    payload = json.dumps(rows, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CrawlJournal:
+    """
+    爬取日志：每抓到一页就往 JSON Lines 文件里追加一条记录（一条对应一个 offset），
+    程序中途出错时已抓到的页不会丢失，重新运行会从第一个缺失的 offset 继续。
+    同一个 offset 出现多次时以最后一条为准；offset 为 None 的记录保存榜单总条数。
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.pages = {}   # offset -> {'hash', 'rows', 'etag', 'fetched_at'}
+        self.total = None
+        self.end_offset = None  # 返回空页的 offset，说明榜单到此为止
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 上次写入时被中断，最后一行可能不完整，直接忽略
+                    continue
+                self._apply(entry)
+        print(f"已读取爬取日志 '{self.path}'：{len(self.pages)} 页。")
+
+    def _apply(self, entry):
+        if entry.get('total') is not None:
+            self.total = entry['total']
+        offset = entry.get('offset')
+        if offset is None:
+            return
+        if not entry['rows']:
+            self.end_offset = offset
+            self.pages.pop(offset, None)
+            return
+        self.pages[offset] = entry
+
+    def _write(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(entry)
+
+    def set_total(self, total):
+        if total != self.total:
+            self._write({'offset': None, 'total': total})
+
+    def get_etag(self, offset):
+        entry = self.pages.get(offset)
+        return entry.get('etag') if entry else None
+
+    def record_page(self, offset, rows, etag=None):
+        """
+        记录一页数据。内容哈希与日志中已有的相同时不写入，返回 False；
+        否则追加一条记录并返回 True。
+        """
+        page_hash = hash_rows(rows)
+        old = self.pages.get(offset)
+        if old is not None and old['hash'] == page_hash:
+            return False
+        self._write({
+            'offset': offset,
+            'hash': page_hash,
+            'rows': rows,
+            'etag': etag,
+            'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        return True
+
+    def is_complete(self, limit):
+        """榜单是否已经全部抓完：总条数内的每个 offset 都有记录。"""
+        end = self.total if self.total is not None else self.end_offset
+        if end is None:
+            return False
+        return all(offset in self.pages for offset in range(0, end, limit))
+
+    def first_missing_offset(self, limit):
+        offset = 0
+        while offset in self.pages:
+            offset += limit
+        return offset
+
+    def missing_offsets(self, total, limit):
+        return [offset for offset in range(0, total, limit) if offset not in self.pages]
+
+    def records(self):
+        """按 offset 顺序拼接所有页的记录。"""
+        end = self.total if self.total is not None else self.end_offset
+        all_records = []
+        for offset in sorted(self.pages):
+            if end is not None and offset >= end:
+                continue
+            all_records.extend(self.pages[offset]['rows'])
+        return all_records
+
+    def compact(self):
+        """重写日志文件，只保留每个 offset 的最新记录，避免刷新多次后文件越来越大。"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if self.total is not None:
+                f.write(json.dumps({'offset': None, 'total': self.total}) + '\n')
+            for offset in sorted(self.pages):
+                f.write(json.dumps(self.pages[offset], ensure_ascii=False) + '\n')
+            if self.end_offset is not None:
+                f.write(json.dumps({'offset': self.end_offset, 'rows': []}) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def mark_end(self, offset):
+        if self.end_offset != offset:
+            self._write({'offset': offset, 'rows': []})
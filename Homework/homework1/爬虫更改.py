@@ -1,68 +1,133 @@
 import pandas as pd
+import numpy as np
 import ast
+import json
+import time
+import argparse
 
-def process_final_v2(input_filename, output_path):
+# hs_Character 里的字段 -> 表格中要填充的列
+mapping_rules = {
+    'hs_Character_Nationality': 'hs_Rank_Rich_Nationality',
+    'hs_Character_NativePlace_Cn': 'hs_Rank_Rich_NativePlace_Cn',
+    'hs_Character_NativePlace_En': 'hs_Rank_Rich_NativePlace_En',
+    'hs_Character_BirthPlace_Cn': 'hs_Rank_Rich_BirthPlace_Cn',
+    'hs_Character_BirthPlace_En': 'hs_Rank_Rich_BirthPlace_En',
+    'hs_Character_Permanent_Cn': 'hs_Rank_Rich_Permanent_Cn',
+    'hs_Character_Permanent_En': 'hs_Rank_Rich_Permanent_En',
+    'hs_Character_Photo': 'hs_Rank_Rich_Photo',
+    'hs_Character_Age': 'hs_Rank_Rich_Age',
+    'hs_Character_Gender': 'hs_Rank_Rich_Gender',
+    'hs_Character_Education_Cn': 'hs_Rank_Rich_Education_Cn',
+    'hs_Character_Education_En': 'hs_Rank_Rich_Education_En',
+    'hs_Character_School_Cn': 'hs_Rank_Rich_School_Cn',
+    'hs_Character_School_En': 'hs_Rank_Rich_School_En'
+}
+
+
+def parse_and_fill(row):
+    """逐行解析 'hs_Character' 并填充数据（原始实现，保留用于对比测试）。"""
+    if 'hs_Character' not in row or pd.isna(row['hs_Character']):
+        return row
+
+    char_string = row['hs_Character']
+    if not isinstance(char_string, str) or not char_string.startswith('['):
+        return row
+
+    try:
+        data_list = ast.literal_eval(char_string)
+        if isinstance(data_list, list) and len(data_list) > 0:
+            char_data = data_list[0]
+            if isinstance(char_data, dict):
+                for source_key, target_column in mapping_rules.items():
+                    value = char_data.get(source_key)
+                    if target_column in row.index:
+                        row[target_column] = value
+    except (ValueError, SyntaxError):
+        # 如果某行格式错误，静默跳过或打印警告
+        # print(f"警告: 在行 {row.name} 解析失败")
+        pass
+
+    return row
+
+
+def parse_character_payload(char_string):
+    """
+    解析一个 hs_Character 字符串，返回其中第一个人物的字典，解析失败返回 None。
+    双引号的标准JSON交给C实现的 json.loads，爬虫保存的Python风格单引号字符串才用 ast.literal_eval。
     """
-    使用Pandas的'python'引擎来读取格式不规范的CSV文件，
-    然后解析'hs_Character'列并填充数据。
+    try:
+        if char_string.startswith('[{"'):
+            data_list = json.loads(char_string)
+        else:
+            data_list = ast.literal_eval(char_string)
+    except (ValueError, SyntaxError):
+        return None
+    if isinstance(data_list, list) and len(data_list) > 0 and isinstance(data_list[0], dict):
+        return data_list[0]
+    return None
+
+
+def expand_character_column(df):
+    """
+    批量版的 parse_and_fill：
+    1. 用 factorize 给 hs_Character 去重，每种字符串只解析一次（相同内容直接复用结果）；
+    2. 每个目标列整列构造好数组后一次性写回，不再逐个单元格赋值。
+    结果与 df.apply(parse_and_fill, axis=1) 一致。
+    """
+    if 'hs_Character' not in df.columns:
+        return df
+    column = df['hs_Character']
+    if column.dtype.kind != 'O' and not pd.api.types.is_string_dtype(column):
+        return df
+
+    is_payload = column.str.startswith('[', na=False).to_numpy(dtype=bool)
+    codes, uniques = pd.factorize(column[is_payload])
+    parsed = [parse_character_payload(text) for text in uniques]
+
+    valid = np.array([char_data is not None for char_data in parsed], dtype=bool)
+    row_valid = valid[codes]
+    rows = np.flatnonzero(is_payload)[row_valid]
+    codes = codes[row_valid]
+
+    df = df.copy()
+    for source_key, target_column in mapping_rules.items():
+        if target_column not in df.columns:
+            continue
+        unique_values = np.empty(len(parsed), dtype=object)
+        unique_values[:] = [char_data.get(source_key) if char_data is not None else None
+                            for char_data in parsed]
+        values = df[target_column].to_numpy(dtype=object, copy=True)
+        values[rows] = unique_values[codes]
+        df[target_column] = pd.Series(values, index=df.index).infer_objects()
+    return df
+
+
+def process_final_v2(input_filename, output_path, vectorized=True):
+    """
+    读取爬虫保存的CSV文件，然后解析'hs_Character'列并填充数据。
+    vectorized=True 时使用C引擎读取并批量展开（expand_character_column），
+    否则沿用原来的'python'引擎 + 逐行 apply。
     """
     print(f"开始最终处理流程 (V2): {input_filename}")
 
     try:
-        # --- 步骤1: 使用更强大的'python'引擎读取CSV文件 ---
-        # 这个引擎能更好地处理引号、换行符等复杂情况。
-        df = pd.read_csv(input_filename, sep=',', engine='python')
-        
+        # --- 步骤1: 读取CSV文件 ---
+        # 爬虫用 to_csv 保存的文件引号规范，C引擎就能正确处理，比'python'引擎快得多
+        engine = 'c' if vectorized else 'python'
+        df = pd.read_csv(input_filename, sep=',', engine=engine)
+
         print("文件读取成功！Pandas已正确分离列。")
         print("数据预览：")
         print(df.head())
         print("\n识别出的列名：")
         print(df.columns)
-        
-        # --- 步骤2: 执行我们已经写好的、健壮的解析逻辑 ---
-        mapping_rules = {
-            'hs_Character_Nationality': 'hs_Rank_Rich_Nationality',
-            'hs_Character_NativePlace_Cn': 'hs_Rank_Rich_NativePlace_Cn',
-            'hs_Character_NativePlace_En': 'hs_Rank_Rich_NativePlace_En',
-            'hs_Character_BirthPlace_Cn': 'hs_Rank_Rich_BirthPlace_Cn',
-            'hs_Character_BirthPlace_En': 'hs_Rank_Rich_BirthPlace_En',
-            'hs_Character_Permanent_Cn': 'hs_Rank_Rich_Permanent_Cn',
-            'hs_Character_Permanent_En': 'hs_Rank_Rich_Permanent_En',
-            'hs_Character_Photo': 'hs_Rank_Rich_Photo',
-            'hs_Character_Age': 'hs_Rank_Rich_Age',
-            'hs_Character_Gender': 'hs_Rank_Rich_Gender',
-            'hs_Character_Education_Cn': 'hs_Rank_Rich_Education_Cn',
-            'hs_Character_Education_En': 'hs_Rank_Rich_Education_En',
-            'hs_Character_School_Cn': 'hs_Rank_Rich_School_Cn',
-            'hs_Character_School_En': 'hs_Rank_Rich_School_En'
-        }
-        
-        def parse_and_fill(row):
-            if 'hs_Character' not in row or pd.isna(row['hs_Character']):
-                return row
-            
-            char_string = row['hs_Character']
-            if not isinstance(char_string, str) or not char_string.startswith('['):
-                return row
-
-            try:
-                data_list = ast.literal_eval(char_string)
-                if isinstance(data_list, list) and len(data_list) > 0:
-                    char_data = data_list[0]
-                    if isinstance(char_data, dict):
-                        for source_key, target_column in mapping_rules.items():
-                            value = char_data.get(source_key)
-                            if target_column in row.index:
-                                row[target_column] = value
-            except (ValueError, SyntaxError):
-                # 如果某行格式错误，静默跳过或打印警告
-                # print(f"警告: 在行 {row.name} 解析失败")
-                pass
-            
-            return row
 
+        # --- 步骤2: 执行我们已经写好的、健壮的解析逻辑 ---
         print("\n开始解析 'hs_Character' 列并填充数据...")
-        df_processed = df.apply(parse_and_fill, axis=1)
+        if vectorized:
+            df_processed = expand_character_column(df)
+        else:
+            df_processed = df.apply(parse_and_fill, axis=1)
         print("数据填充完成。")
 
         # --- 步骤3: 清理和保存 ---
@@ -78,8 +143,65 @@ def process_final_v2(input_filename, output_path):
     except Exception as e:
         print(f"处理过程中发生未知错误: {e}")
 
+
+def make_synthetic_list(n_rows=100_000, n_people=20_000, seed=0):
+    """构造一个合成榜单：n_people 个不同的人物，重复填满 n_rows 行（模拟多年榜单合并）。"""
+    rng = np.random.default_rng(seed)
+    people = []
+    for i in range(n_people):
+        char_data = {
+            'hs_Character_ID': i,
+            'hs_Character_Fullname_Cn': f'人物{i}',
+            'hs_Character_Gender': '先生' if i % 5 else '女士',
+            'hs_Character_Age': str(30 + i % 60),
+            'hs_Character_Photo': f'https://res.hurun.net/photo/{i:06d}.jpg',
+            'hs_Character_Nationality': 198,
+        }
+        for source_key in mapping_rules:
+            char_data.setdefault(source_key, f'{source_key[13:]}-{i % 300}')
+        people.append(str([char_data]))
+
+    picks = rng.integers(0, n_people, size=n_rows)
+    df = pd.DataFrame({'hs_Character': np.array(people, dtype=object)[picks]})
+    for target_column in mapping_rules.values():
+        df[target_column] = np.nan
+    df['hs_Rank_Rich_Wealth'] = rng.integers(20, 5000, size=n_rows)
+    return df
+
+
+def benchmark_expansion(n_rows=100_000, n_people=20_000):
+    """在合成榜单上比较逐行 apply 与批量展开的耗时，并检查两者结果一致。"""
+    df = make_synthetic_list(n_rows, n_people)
+    print(f"合成榜单: {n_rows} 行, {n_people} 个不同人物")
+
+    start = time.perf_counter()
+    fast = expand_character_column(df)
+    fast_seconds = time.perf_counter() - start
+    print(f"批量展开 expand_character_column: {fast_seconds:.2f} 秒")
+
+    start = time.perf_counter()
+    slow = df.apply(parse_and_fill, axis=1)
+    slow_seconds = time.perf_counter() - start
+    print(f"逐行 apply(parse_and_fill):        {slow_seconds:.2f} 秒")
+
+    columns = list(mapping_rules.values())
+    same = fast[columns].astype(str).equals(slow[columns].astype(str))
+    print(f"加速比: {slow_seconds / fast_seconds:.1f}x, 结果一致: {same}")
+    return slow_seconds, fast_seconds
+
+
 # --- 主程序运行部分 ---
-input_file = '胡润百富榜完整数据.csv'
-output_file = '胡润百富榜完整数据2.0.xlsx'
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="展开 hs_Character 列并保存为Excel")
+    parser.add_argument('--benchmark', action='store_true', help="在合成榜单上比较新旧两种展开方式的耗时")
+    parser.add_argument('--rows', type=int, default=100_000, help="合成榜单的行数")
+    parser.add_argument('--legacy', action='store_true', help="使用原来的逐行解析方式")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_expansion(args.rows)
+    else:
+        input_file = '胡润百富榜完整数据.csv'
+        output_file = '胡润百富榜完整数据2.0.xlsx'
 
-process_final_v2(input_file, output_file)
+        process_final_v2(input_file, output_file, vectorized=not args.legacy)
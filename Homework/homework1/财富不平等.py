@@ -0,0 +1,166 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from 数据加载 import load_rich_list
+from 报表引擎 import explode_industries, industry_column, wealth_column, age_column, headquarters_column, \
+    AGE_BINS, AGE_LABELS
+from 地区解析 import resolve_province
+
+output_excel_path = '财富不平等分析报告.xlsx'
+
+# 分组维度名 -> 生成该维度的函数（输入已展开行业的表格）
+GROUP_DIMENSIONS = {
+    '行业': lambda df: df[industry_column].astype(str),
+    # 省份按企业总部所在地统计，国外总部单独归为一类
+    '省份': lambda df: resolve_province(df[headquarters_column]).fillna('国外'),
+    '年龄段': lambda df: pd.cut(pd.to_numeric(df[age_column], errors='coerce'), bins=AGE_BINS,
+                              labels=AGE_LABELS, right=False).astype(object).fillna('年龄未知'),
+}
+
+TOP_K = (1, 3, 10)
+
+
+def prepare_groups(df, by=('行业', '省份', '年龄段')):
+    """
+    展开多行业后生成分组编码，并按 (组, 财富) 排序，使每个组在数组中占一段连续、升序的区间。
+    返回 (分组标签表, 排好序的财富, 每组起始位置, 每组人数)。
+    """
+    df = df.assign(**{wealth_column: pd.to_numeric(df[wealth_column], errors='coerce')})
+    df = df[df[wealth_column] > 0]
+    if '行业' in by:
+        df = explode_industries(df.dropna(subset=[industry_column]))
+    keys = pd.DataFrame({name: GROUP_DIMENSIONS[name](df).to_numpy() for name in by})
+
+    codes = keys.groupby(list(by), sort=True).ngroup().to_numpy()
+    wealth = df[wealth_column].to_numpy(dtype=np.float64)
+    order = np.lexsort((wealth, codes))
+    codes, wealth = codes[order], wealth[order]
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    labels = keys.iloc[order[starts]].reset_index(drop=True)
+    return labels, wealth, starts, sizes
+
+
+def _segment_stats(values, starts, sizes, top_k=TOP_K, tail_fraction=0.2, min_tail=10):
+    """
+    在二维数组上一次性计算所有组的指标：每一行是一份样本（原始数据或一次自助抽样），
+    每个组占据各行中同一段连续的列，且组内已按财富升序排列。
+    全部用累积和与 reduceat 分段归约完成，没有按组的Python循环。
+    """
+    n_rows, n_total = values.shape
+    ends = starts + sizes
+    cumulative = np.zeros((n_rows, n_total + 1))
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    totals = cumulative[:, ends] - cumulative[:, starts]
+
+    # 基尼系数：G = 2·Σ(i·x_i) / (n·Σx) - (n+1)/n，i 为组内升序名次
+    ranks = np.arange(n_total) - np.repeat(starts, sizes) + 1
+    weighted = np.add.reduceat(values * ranks, starts, axis=1)
+    stats = {'基尼系数': 2 * weighted / (sizes * totals) - (sizes + 1) / sizes}
+
+    # 前k名财富占比：组内升序排列，前k名就是每段末尾的k个
+    for k in top_k:
+        k_clipped = np.minimum(k, sizes)
+        stats[f'前{k}名占比'] = (cumulative[:, ends] - cumulative[:, ends - k_clipped]) / totals
+
+    # 帕累托尾部指数（Hill估计）：取每组最富的 tail_fraction 部分，
+    # ξ = mean(ln x_top) - ln x_threshold，α = 1/ξ；人数不足 min_tail 的组不估计
+    logs = np.log(values)
+    log_cumulative = np.zeros((n_rows, n_total + 1))
+    np.cumsum(logs, axis=1, out=log_cumulative[:, 1:])
+    k_tail = np.clip(np.floor(tail_fraction * sizes).astype(np.int64), 1, np.maximum(sizes - 1, 1))
+    threshold = logs[:, np.maximum(ends - k_tail - 1, 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xi = (log_cumulative[:, ends] - log_cumulative[:, ends - k_tail]) / k_tail - threshold
+        # 尾部财富全部相同时 ξ 为0（累积和相减只剩舍入误差），无法估计
+        alpha = np.where(xi > 1e-9, 1 / xi, np.nan)
+    stats['帕累托指数'] = np.where(sizes >= min_tail, alpha, np.nan)
+    return stats
+
+
+def _bootstrap_indices(starts, sizes, n_resamples, rng):
+    """
+    组内有放回抽样的下标。每组在原位置抽取同样数量的样本，再把每行的下标排序：
+    因为组内财富已升序排列，排序后的下标取出的值仍是组内升序，组的区间位置也保持不变。
+    """
+    group_starts = np.repeat(starts, sizes)
+    group_sizes = np.repeat(sizes, sizes)
+    draws = rng.random((n_resamples, len(group_starts)))
+    indices = group_starts + (draws * group_sizes).astype(np.int64)
+    indices.sort(axis=1)
+    return indices
+
+
+def inequality_report(df, by=('行业', '省份', '年龄段'), n_bootstrap=1000, confidence=0.95,
+                      min_size=5, seed=0, batch_size=200):
+    """
+    按分组维度计算财富的基尼系数、前k名占比和帕累托尾部指数，并给出自助法置信区间。
+    人数少于 min_size 的组不计算指标（仍列出人数和总财富）。
+    """
+    labels, wealth, starts, sizes = prepare_groups(df, by)
+    point = _segment_stats(wealth[None, :], starts, sizes)
+
+    rng = np.random.default_rng(seed)
+    samples = {name: [] for name in point}
+    for batch_start in range(0, n_bootstrap, batch_size):
+        n_resamples = min(batch_size, n_bootstrap - batch_start)
+        resampled = wealth[_bootstrap_indices(starts, sizes, n_resamples, rng)]
+        for name, values in _segment_stats(resampled, starts, sizes).items():
+            samples[name].append(values)
+
+    report = labels.assign(人数=sizes, 总财富=np.add.reduceat(wealth, starts))
+    lower_q, upper_q = (1 - confidence) / 2, 1 - (1 - confidence) / 2
+    too_small = sizes < min_size
+    for name, values in point.items():
+        report[name] = np.where(too_small, np.nan, values[0])
+        if n_bootstrap > 0:
+            stacked = np.vstack(samples[name])
+            # 所有重抽样都没有值的组（例如人数不够估计帕累托指数）跳过，不让 nanquantile 报 All-NaN 警告
+            has_value = ~np.isnan(stacked).all(axis=0)
+            lower, upper = np.full((2, stacked.shape[1]), np.nan)
+            lower[has_value], upper[has_value] = np.nanquantile(stacked[:, has_value], [lower_q, upper_q], axis=0)
+            report[f'{name}下限'] = np.where(too_small, np.nan, lower)
+            report[f'{name}上限'] = np.where(too_small, np.nan, upper)
+    return report.sort_values('总财富', ascending=False, ignore_index=True)
+
+
+def lorenz_curves(df, by=('行业',), points=21):
+    """
+    各组的洛伦兹曲线：在 points 个等间隔的人口比例上取累计财富占比，返回长表格，
+    每组 points 行（'人口比例'、'财富比例' 两列加上分组列）。
+    """
+    labels, wealth, starts, sizes = prepare_groups(df, by)
+    cumulative = np.r_[0, np.cumsum(wealth)]
+    totals = cumulative[starts + sizes] - cumulative[starts]
+
+    population_share = np.linspace(0, 1, points)
+    # 每组在各人口比例处包含的人数（向下取整），二维数组形状为 (组数, points)
+    counts = np.floor(population_share[None, :] * sizes[:, None] + 1e-9).astype(np.int64)
+    wealth_share = (cumulative[starts[:, None] + counts] - cumulative[starts[:, None]]) / totals[:, None]
+
+    curves = labels.loc[labels.index.repeat(points)].reset_index(drop=True)
+    return curves.assign(人口比例=np.tile(population_share, len(labels)), 财富比例=wealth_share.ravel())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="按行业×省份×年龄段计算财富不平等指标")
+    parser.add_argument('--by', nargs='+', default=['行业', '省份', '年龄段'], choices=list(GROUP_DIMENSIONS),
+                        help="分组维度")
+    parser.add_argument('--bootstrap', type=int, default=1000, help="自助抽样次数，0表示不计算置信区间")
+    parser.add_argument('--min-size', type=int, default=5, help="计算指标所需的最少人数")
+    parser.add_argument('--output', default=output_excel_path)
+    args = parser.parse_args()
+
+    df = load_rich_list()
+    start = time.perf_counter()
+    report = inequality_report(df, by=tuple(args.by), n_bootstrap=args.bootstrap, min_size=args.min_size)
+    curves = lorenz_curves(df, by=tuple(args.by))
+    print(f"共 {len(report)} 个分组，计算耗时 {time.perf_counter() - start:.2f} 秒。")
+
+    with pd.ExcelWriter(args.output) as writer:
+        report.to_excel(writer, sheet_name='不平等指标', index=False)
+        curves.to_excel(writer, sheet_name='洛伦兹曲线', index=False)
+    print(f"报告已保存至: {args.output}")
+    print(report.dropna(subset=['基尼系数']).head(10).to_string())
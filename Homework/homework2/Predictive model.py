@@ -1,16 +1,18 @@
+import argparse
 import matplotlib
 
 matplotlib.use('TkAgg')
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+from weather_store import load_weather
+from sarima_cache import MODEL_SPEC, fit_sarimax, forecast_cities
+from sarima_search import search_orders
 
 
 def prepare_data():
-    # 读取历史数据 (2022-2024)
-    df = pd.read_csv('output/clean_大连天气_2022-2024.csv')
-    df['日期'] = pd.to_datetime(df['日期'], format='%Y年%m月%d日')
+    # 读取历史数据 (2022-2024)，只读取需要的年份分区和列
+    df = load_weather('dalian', years=[2022, 2023, 2024], columns=['日期', '最高温度'])
     df['年份'] = df['日期'].dt.year
     df['月份'] = df['日期'].dt.month
 
@@ -27,22 +29,17 @@ def prepare_data():
     )
 
     # 读取2025年实际数据
-    actual_2025 = pd.read_csv('output/大连天气_2025_1-6月.csv')
-    actual_2025['日期'] = pd.to_datetime(actual_2025['日期'], format='%Y年%m月%d日')
+    actual_2025 = load_weather('dalian', years=[2025], columns=['日期', '最高温度'])
     actual_2025_avg = actual_2025.groupby(actual_2025['日期'].dt.to_period('M'))['最高温度'].mean()
 
     return history_ts, actual_2025_avg
 
 
-def model_and_predict(history_ts, actual_2025_avg):
-    # 建立SARIMA模型
-    model = SARIMAX(history_ts,
-                    order=(1, 0, 1),
-                    seasonal_order=(0, 1, 1, 12),
-                    enforce_stationarity=False,
-                    enforce_invertibility=False)
-
-    model_fit = model.fit(disp=False)
+def model_and_predict(history_ts, actual_2025_avg, spec=MODEL_SPEC):
+    # 建立SARIMA模型：默认 order=(1, 0, 1)，seasonal_order=(0, 1, 1, 12)
+    # 同一份数据、同一设置的拟合结果缓存在 output/sarima_cache 中，再次运行时直接读取
+    model_fit, from_cache = fit_sarimax(history_ts, spec)
+    print("使用缓存的模型" if from_cache else "模型拟合完成，已缓存")
 
     # 预测2025年1-6月
     forecast = model_fit.get_forecast(steps=6)
@@ -87,11 +84,28 @@ def model_and_predict(history_ts, actual_2025_avg):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SARIMA 预测大连2025年1-6月月平均最高温度")
+    parser.add_argument('--batch', nargs='+', metavar='CITY', default=None,
+                        help="批量模式：并行预测这些城市的最高温度、最低温度和风级")
+    parser.add_argument('--search', action='store_true', help="自动搜索 SARIMA 阶数，代替固定的 (1,0,1)(0,1,1,12)")
+    parser.add_argument('--workers', type=int, default=None, help="批量模式和阶数搜索的进程数")
+    args = parser.parse_args()
+
+    if args.batch:
+        table = forecast_cities(args.batch, years=[2022, 2023, 2024], steps=6, max_workers=args.workers)
+        table.to_csv('output/sarima_forecast.csv', index=False, encoding='utf_8_sig')
+        print(table.round(1).to_string(index=False))
+        raise SystemExit
+
     # 数据准备
     history_ts, actual_2025_avg = prepare_data()
 
     # 建模与预测
-    forecast_mean, conf_int = model_and_predict(history_ts, actual_2025_avg)
+    spec = MODEL_SPEC
+    if args.search:
+        spec, ranking = search_orders(history_ts, max_workers=args.workers)
+        print(f"选出的阶数: order={spec['order']}, seasonal_order={spec['seasonal_order']}")
+    forecast_mean, conf_int = model_and_predict(history_ts, actual_2025_avg, spec)
 
     # 打印预测结果
     print("\n2025年预测结果:")
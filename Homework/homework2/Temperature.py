@@ -4,16 +4,14 @@ matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.font_manager import FontProperties
+from weather_store import load_weather
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
 plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
 
-# 读取数据
-data = pd.read_csv('output/大连天气_2022-2024.csv')
-
-# 转换日期列为datetime类型
-data['日期'] = pd.to_datetime(data['日期'], format="%Y年%m月%d日")
+# 读取数据（存储库中日期、温度已是正确的类型，只读取需要的年份分区）
+data = load_weather('dalian', years=[2022, 2023, 2024])
 
 # 提取年份和月份
 data['年份'] = data['日期'].dt.year
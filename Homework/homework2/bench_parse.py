@@ -0,0 +1,98 @@
+import os
+import io
+import gzip
+import json
+import time
+import argparse
+import contextlib
+import requests
+from requests.structures import CaseInsensitiveDict
+from bs4 import BeautifulSoup
+import pachong
+from http_cache import CACHE_DIR
+
+
+def load_saved_pages(path=CACHE_DIR):
+    """
+    读取保存下来的网页，返回 [(正文字节, 响应头)]。
+    path 可以是 http_cache 的缓存目录（*.html.gz + *.json），也可以是存放 .html 文件的目录。
+    """
+    pages = []
+    for folder, _, files in os.walk(path):
+        for name in sorted(files):
+            file_path = os.path.join(folder, name)
+            if name.endswith('.html.gz'):
+                with open(file_path[:-len('.html.gz')] + '.json', 'r', encoding='utf-8') as f:
+                    headers = json.load(f)['headers']
+                with gzip.open(file_path, 'rb') as f:
+                    pages.append((f.read(), headers))
+            elif name.endswith('.html'):
+                with open(file_path, 'rb') as f:
+                    pages.append((f.read(), {}))
+    return pages
+
+
+def legacy_parse(content, headers):
+    """原来 get_monthly_weather 中的解码和解析流程（不含网络请求），作为对照。"""
+    response = requests.models.Response()
+    response._content = content
+    response.headers = CaseInsensitiveDict(headers)
+    response.status_code = 200
+
+    if 'charset=gbk' in response.text.lower() or 'charset=gb2312' in response.text.lower():
+        response.encoding = 'gbk'
+    else:
+        response.encoding = response.apparent_encoding
+
+    print("正确解码后的内容示例:", response.text[:500])
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+    table = soup.find('table')
+    if not table:
+        return None
+
+    monthly_data = []
+    for row in table.find_all('tr')[1:]:
+        cols = row.find_all('td')
+        if len(cols) >= 4:
+            monthly_data.append(pachong._parse_row([col.get_text(strip=True) for col in cols]))
+    return monthly_data
+
+
+def fast_parse(content, headers):
+    html = content.decode(pachong.detect_encoding(content, headers), errors='replace')
+    return pachong.parse_weather_table(html)
+
+
+def benchmark(pages, parse, repeat=3):
+    """返回 (每秒解析的行数, 全部结果)，取 repeat 次中最快的一次。打印输出被丢弃，不计入比较。"""
+    best, results = None, None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            results = [parse(content, headers) for content, headers in pages]
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    rows = sum(len(result or []) for result in results)
+    return rows / best, results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="比较天气网页的原解析流程与快速解析流程")
+    parser.add_argument('--pages', default=CACHE_DIR, help="保存的网页目录（默认为 http_cache 缓存目录）")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_saved_pages(args.pages)
+    if not pages:
+        print(f"'{args.pages}' 中没有保存的网页，请先运行一次 pachong.py 生成缓存。")
+        raise SystemExit(1)
+
+    legacy_rate, legacy_results = benchmark(pages, legacy_parse, args.repeat)
+    fast_name = 'lxml' if pachong.lxml is not None else 'html.parser（未安装 lxml）'
+    fast_rate, fast_results = benchmark(pages, fast_parse, args.repeat)
+
+    print(f"{len(pages)} 个网页，共 {sum(len(r or []) for r in fast_results)} 行")
+    print(f"原流程（整页 lower + apparent_encoding + html.parser）: {legacy_rate:,.0f} 行/秒")
+    print(f"新流程（按响应头/meta 判断编码 + {fast_name}）: {fast_rate:,.0f} 行/秒")
+    print(f"加速 {fast_rate / legacy_rate:.1f} 倍，结果{'一致' if fast_results == legacy_results else '不一致！'}")
@@ -0,0 +1,103 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = 'output/http_cache'
+
+# 缓存时保留的响应头：编码判断需要 Content-Type，条件请求需要 ETag / Last-Modified
+_KEPT_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+class HttpCache:
+    """
+    按 URL 缓存网页的磁盘缓存，正文用 gzip 压缩保存。
+    immutable=True 的页面（已经过去的月份，内容不会再变）一旦缓存就永久使用，不再联网；
+    其他页面（当月）每次都带 If-None-Match / If-Modified-Since 发送条件请求，
+    服务器返回 304 时直接使用缓存的正文。当月缓存的页面可能只有半个月的数据，
+    所以到了下个月第一次按不可变页面请求时仍会验证一次，之后才永久使用。
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        folder = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(folder, key + '.json'), os.path.join(folder, key + '.html.gz')
+
+    def _read(self, url):
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with gzip.open(body_path, 'rb') as f:
+            return meta, f.read()
+
+    def _write_meta(self, url, meta):
+        meta_path, _ = self._paths(url)
+        # 先写临时文件再替换，多个线程或中途中断都不会留下写了一半的缓存
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _write(self, url, response, immutable):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with gzip.open(body_path + '.tmp', 'wb', compresslevel=6) as f:
+            f.write(response.content)
+        os.replace(body_path + '.tmp', body_path)
+        self._write_meta(url, {
+            'url': url,
+            'immutable': immutable,
+            'fetched_at': time.time(),
+            'headers': {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+        })
+
+    def is_cached(self, url):
+        """该页面能否不联网直接从缓存返回（只有已确认不可变的页面可以）。"""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return False
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('immutable', False)
+
+    @staticmethod
+    def _to_response(url, meta, body):
+        response = requests.models.Response()
+        response.url = url
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def get(self, url, session=None, headers=None, immutable=False, timeout=20):
+        """
+        与 requests.get 用法相同，返回 requests.Response；来自缓存的响应 from_cache 为 True。
+        只缓存状态码为 200 的响应，错误页不会被当成永久内容保存。
+        """
+        meta, body = self._read(url)
+        if meta is not None and meta.get('immutable'):
+            return self._to_response(url, meta, body)
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if 'ETag' in meta['headers']:
+                request_headers['If-None-Match'] = meta['headers']['ETag']
+            if 'Last-Modified' in meta['headers']:
+                request_headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and meta is not None:
+            if immutable:
+                self._write_meta(url, dict(meta, immutable=True, fetched_at=time.time()))
+            return self._to_response(url, meta, body)
+        if response.status_code == 200:
+            self._write(url, response, immutable)
+        response.from_cache = False
+        return response
@@ -0,0 +1,116 @@
+import os
+import json
+import calendar
+import argparse
+import threading
+from datetime import datetime
+from weather_store import STORE_DIR, available_years, ensure_imported, load_weather, upsert_weather
+from pachong import is_past_month
+from pachong_batch import crawl_pages, month_range
+
+# 存储库中还没有数据的城市从这个月份开始抓取
+DEFAULT_START = '2022-01'
+
+# 每个城市分区旁边的清单：已经完整抓取过的月份 ['YYYYMM', ...]
+MANIFEST_FILENAME = 'fetched_months.json'
+
+
+def _manifest_path(city, store_dir=STORE_DIR):
+    return os.path.join(store_dir, city, MANIFEST_FILENAME)
+
+
+def _days_in_month(year_month):
+    return calendar.monthrange(int(year_month[:4]), int(year_month[4:]))[1]
+
+
+def load_fetched_months(city, store_dir=STORE_DIR):
+    """
+    读取已完整抓取的月份集合。还没有清单时（从CSV导入的或旧版本的存储库），
+    把存储库中每天都有数据的过去月份记为已抓取并写出清单，天数不全的月份之后会重新抓取。
+    """
+    path = _manifest_path(city, store_dir)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return set(json.load(f))
+    ensure_imported(city, store_dir)
+    if not available_years(city, store_dir):
+        return set()
+    dates = load_weather(city, columns=['日期'], store_dir=store_dir)['日期']
+    counts = dates.dt.strftime('%Y%m').value_counts()
+    fetched = {month for month, days in counts.items() if is_past_month(month) and days == _days_in_month(month)}
+    save_fetched_months(city, fetched, store_dir)
+    return fetched
+
+
+def save_fetched_months(city, months, store_dir=STORE_DIR):
+    path = _manifest_path(city, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(sorted(months), f)
+    os.replace(path + '.tmp', path)
+
+
+def missing_months(city, start=None, end=None, store_dir=STORE_DIR):
+    """
+    返回还需要抓取的月份 ['YYYYMM', ...]：清单中没有记录的月份，包括上次抓取时还没有过完的当月。
+    start 默认从已抓取的第一个月开始，end 默认到本月。
+    """
+    fetched = load_fetched_months(city, store_dir)
+    start = start or (f"{min(fetched)[:4]}-{min(fetched)[4:]}" if fetched else DEFAULT_START)
+    end = end or datetime.now().strftime('%Y-%m')
+    return [year_month for year_month in month_range(start, end) if year_month not in fetched]
+
+
+class StoreSink:
+    """crawl_pages 的保存目标：每抓完一个月就把这个月的行合并进存储库。"""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.rows_written = 0
+        self._lock = threading.Lock()
+
+    def write(self, city, year_month, rows):
+        # 同一城市同一年份的分区文件（以及清单）不能被两个线程同时重写
+        with self._lock:
+            written = upsert_weather(rows, city, self.store_dir)
+            self.rows_written += written
+            # 当月还没有过完、或者页面上的天数不全（空表格、页面改版、被拦截），下次更新时要重新抓取，不记入清单
+            if is_past_month(year_month) and written == _days_in_month(year_month):
+                fetched = load_fetched_months(city, self.store_dir)
+                save_fetched_months(city, fetched | {year_month}, self.store_dir)
+
+
+def ingest(cities, start=None, end=None, store_dir=STORE_DIR, max_workers=4, rate=2.0, max_per_host=4):
+    """
+    增量更新：只抓取存储库中缺少的月份，按 (城市, 日期) 合并，只清洗新抓到的行。
+    每月更新一次时只需要抓一个网页、重写一个年份分区。返回抓取失败的 (城市, 月份) 列表。
+    """
+    tasks = []
+    for city in cities:
+        months = missing_months(city, start, end, store_dir)
+        print(f"{city}: 缺少 {len(months)} 个月 {months[:6]}{' ...' if len(months) > 6 else ''}")
+        tasks.extend((city, year_month) for year_month in months)
+    if not tasks:
+        print("存储库已是最新，不需要抓取。")
+        return []
+
+    sink = StoreSink(store_dir)
+    failed = crawl_pages(tasks, sink, max_workers=max_workers, rate=rate, max_per_host=max_per_host)
+    print(f"已合并 {sink.rows_written} 行到存储库。")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="增量抓取存储库中缺少的月份，合并进天气数据存储库")
+    parser.add_argument('--cities', nargs='+', default=['dalian'], help="城市拼音，如 dalian beijing")
+    parser.add_argument('--start', default=None, help="起始月份 YYYY-MM（默认从已有数据的第一个月开始）")
+    parser.add_argument('--end', default=None, help="结束月份 YYYY-MM（默认到本月）")
+    parser.add_argument('--workers', type=int, default=4, help="线程数")
+    parser.add_argument('--rate', type=float, default=2.0, help="对同一网站每秒最多请求数")
+    args = parser.parse_args()
+
+    ingest(args.cities, args.start, args.end, max_workers=args.workers, rate=args.rate)
+    for city in args.cities:
+        if available_years(city):
+            data = load_weather(city)
+            print(f"{city}: {data['日期'].min():%Y-%m-%d} ~ {data['日期'].max():%Y-%m-%d}，共 {len(data)} 行")
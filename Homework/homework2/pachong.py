@@ -1,71 +1,137 @@
 import requests
+import re
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import os
+from http_cache import HttpCache
+
+try:
+    import lxml.html
+except ImportError:
+    # 没有安装 lxml 时退回 BeautifulSoup 自带的 html.parser（纯Python，较慢）
+    lxml = None
+
+# 城市用网站上的拼音缩写（如 dalian、beijing），月份为 'YYYYMM'
+BASE_URL = "http://www.tianqihoubao.com/lishi/{city}/month/{year_month}.html"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# 网页缓存：过去月份的历史天气不会再变，下载一次后永久使用；当月的页面用条件请求验证
+HTTP_CACHE = HttpCache()
+
+
+def is_past_month(year_month):
+    return year_month < datetime.now().strftime('%Y%m')
+
+
+def is_cached(year_month, city='dalian'):
+    """该月的页面是否已经永久缓存（不需要联网，也不需要礼貌性延迟）。"""
+    return HTTP_CACHE.is_cached(BASE_URL.format(city=city, year_month=year_month))
+
+
+_HEADER_CHARSET = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# 网站声明 gb2312/gbk，但实际会出现两者以外的字符，统一用它们的超集 gb18030 解码
+_CHARSET_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030'}
+
+# lxml 不接受带编码声明的 str（ValueError: Unicode strings with encoding declaration are not supported），
+# 网页已经按 detect_encoding 解码过，解析前去掉开头的 <?xml ... ?> 声明
+_XML_DECLARATION = re.compile(r'^﻿?\s*<\?xml[^>]*\?>')
+
+
+def detect_encoding(content, headers=None):
+    """
+    从 Content-Type 响应头或网页前 2KB 中的 <meta charset> 判断编码，都没有时按 utf-8。
+    不再对整页做 lower() 或 apparent_encoding 字符统计。
+    """
+    charset = None
+    content_type = (headers or {}).get('Content-Type', '')
+    match = _HEADER_CHARSET.search(content_type)
+    if match:
+        charset = match.group(1)
+    else:
+        match = _META_CHARSET.search(content[:2048])
+        if match:
+            charset = match.group(1).decode('ascii')
+    charset = (charset or 'utf-8').lower()
+    return _CHARSET_ALIASES.get(charset, charset)
+
+
+def _parse_row(texts):
+    """把一行四个单元格的文字拆成日期、白天/夜晚天气、最高/最低温度、白天/夜晚风力。"""
+    date, weather, temp, wind = texts[:4]
+    weather = weather.split('/')
+    temp = temp.replace('℃', '').split('/')
+    wind = wind.split('/')
+    return {
+        '日期': date,
+        '白天天气': weather[0].strip(),
+        '夜晚天气': weather[1].strip() if len(weather) > 1 else '',
+        '最高温度': temp[0].strip(),
+        '最低温度': temp[1].strip() if len(temp) > 1 else '',
+        '白天风力': wind[0].strip(),
+        '夜晚风力': wind[1].strip() if len(wind) > 1 else ''
+    }
+
+
+def _table_rows_lxml(html):
+    table = lxml.html.fromstring(_XML_DECLARATION.sub('', html, count=1)).find('.//table')
+    if table is None:
+        return None
+    # 与 BeautifulSoup 的 get_text(strip=True) 一致：每段文字各自去掉首尾空白后拼接
+    return [[''.join(text.strip() for text in td.itertext()) for td in tr.iter('td')]
+            for tr in table.iter('tr')]
+
+
+def _table_rows_bs4(html):
+    table = BeautifulSoup(html, 'html.parser').find('table')
+    if table is None:
+        return None
+    return [[td.get_text(strip=True) for td in tr.find_all('td')] for tr in table.find_all('tr')]
+
+
+def parse_weather_table(html):
+    """解析网页中第一个表格的天气数据（跳过表头），没有表格时返回 None。优先使用C实现的 lxml。"""
+    rows = _table_rows_lxml(html) if lxml is not None else _table_rows_bs4(html)
+    if rows is None:
+        return None
+    rows = rows[1:]  # 跳过表头
+    print(f"找到{len(rows)}行数据")
+
+    monthly_data = []
+    for texts in rows:
+        if len(texts) >= 4:
+            try:
+                monthly_data.append(_parse_row(texts))
+            except Exception as e:
+                print(f"处理行时出错: {e}")
+                continue
+    return monthly_data
 
 
-def get_monthly_weather(year_month):
-    base_url = "http://www.tianqihoubao.com/lishi/dalian/month/{}.html"
-    url = base_url.format(year_month)
+def get_monthly_weather(year_month, city='dalian', session=None, use_cache=True):
+    """获取某个城市一个月的天气数据，出错时返回 None。传入 session 时复用其连接池。"""
+    url = BASE_URL.format(city=city, year_month=year_month)
 
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-
-        # 关键修改：先检查实际编码，再设置解码方式
-        if 'charset=gbk' in response.text.lower() or 'charset=gb2312' in response.text.lower():
-            response.encoding = 'gbk'
+        if use_cache:
+            response = HTTP_CACHE.get(url, session=session, headers=HEADERS, immutable=is_past_month(year_month))
         else:
-            response.encoding = response.apparent_encoding  # 自动检测编码
+            response = (session or requests).get(url, headers=HEADERS, timeout=20)
 
-        print("正确解码后的内容示例:", response.text[:500])  # 打印前500字符检查
+        # 编码只从响应头和网页开头的 <meta> 中判断，整页只解码一次
+        html = response.content.decode(detect_encoding(response.content, response.headers), errors='replace')
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 尝试查找所有表格，而不仅限于class="b"
-        table = soup.find('table')
-        if not table:
+        monthly_data = parse_weather_table(html)
+        if monthly_data is None:
             print("未找到表格元素")
             return None
 
-        rows = table.find_all('tr')[1:]  # 跳过表头
-        print(f"找到{len(rows)}行数据")
-
-        monthly_data = []
-        for row in rows:
-            cols = row.find_all('td')
-            if len(cols) >= 4:
-                try:
-                    date = cols[0].get_text(strip=True)
-                    weather = cols[1].get_text(strip=True).split('/')
-                    weather_day = weather[0].strip()
-                    weather_night = weather[1].strip() if len(weather) > 1 else ''
-
-                    temp = cols[2].get_text(strip=True).replace('℃', '').split('/')
-                    temp_high = temp[0].strip()
-                    temp_low = temp[1].strip() if len(temp) > 1 else ''
-
-                    wind = cols[3].get_text(strip=True).split('/')
-                    wind_day = wind[0].strip()
-                    wind_night = wind[1].strip() if len(wind) > 1 else ''
-
-                    monthly_data.append({
-                        '日期': date,
-                        '白天天气': weather_day,
-                        '夜晚天气': weather_night,
-                        '最高温度': temp_high,
-                        '最低温度': temp_low,
-                        '白天风力': wind_day,
-                        '夜晚风力': wind_night
-                    })
-                except Exception as e:
-                    print(f"处理行时出错: {e}")
-                    continue
-
         print(f"成功提取{len(monthly_data)}条数据")
         return monthly_data
 
@@ -83,11 +149,13 @@ def get_weather_data(start_year=2022, end_year=2024):
             year_month = f"{year}{month:02d}"
             print(f"正在获取 {year}年{month}月 数据...")
 
+            cached = is_cached(year_month)
             monthly_data = get_monthly_weather(year_month)
             if monthly_data:
                 all_data.extend(monthly_data)
 
-            time.sleep(2)  # 礼貌性延迟，避免被封
+            if not cached:
+                time.sleep(2)  # 礼貌性延迟，避免被封（从缓存读取时不需要）
 
     # 转换为DataFrame并保存
     df = pd.DataFrame(all_data)
@@ -102,4 +170,5 @@ def get_weather_data(start_year=2022, end_year=2024):
 
 
 # 执行爬取
-weather_df = get_weather_data(2022, 2024)
\ No newline at end of file
+if __name__ == '__main__':
+    weather_df = get_weather_data(2022, 2024)
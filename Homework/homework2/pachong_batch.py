@@ -0,0 +1,155 @@
+import os
+import csv
+import time
+import threading
+import argparse
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pachong import get_monthly_weather, is_cached, BASE_URL
+
+COLUMNS = ['城市', '日期', '白天天气', '夜晚天气', '最高温度', '最低温度', '白天风力', '夜晚风力']
+
+
+class PolitenessBudget:
+    """
+    每个域名的礼貌限制：同一时刻最多 max_concurrent 个请求，相邻两次请求至少间隔 1/rate 秒。
+    取代原来每页之后固定的 time.sleep(2)，多个城市、多个月份并发时总速率也不会超过设定值。
+    """
+
+    def __init__(self, rate=2.0, max_concurrent=4):
+        self.interval = 1.0 / rate
+        self.max_concurrent = max_concurrent
+        self._next_time = {}     # 域名 -> 下一次允许发请求的时间
+        self._semaphores = {}    # 域名 -> 并发数信号量
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_concurrent)
+            return self._semaphores[host]
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        self._semaphore(host).acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time.get(host, now))
+            self._next_time[host] = start + self.interval
+        time.sleep(max(0.0, start - now))
+        return host
+
+    def release(self, host):
+        self._semaphores[host].release()
+
+
+def create_session(pool_size=8):
+    """带连接池和自动重试的会话，所有线程共享，避免每个请求重新建立TCP连接。"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def month_range(start, end):
+    """'2022-01' 到 '2024-12' 之间（含两端）的所有月份，返回 ['202201', ..., '202412']。"""
+    year, month = map(int, start.split('-'))
+    end_year, end_month = map(int, end.split('-'))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f"{year}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class CsvSink:
+    """把每批解析好的行立即追加到CSV文件（带城市列），程序中途停止时已抓到的数据不会丢失。"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf_8_sig' if new_file else 'utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, city, year_month, rows):
+        with self._lock:
+            self._writer.writerows({'城市': city, **row} for row in rows)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def crawl_cities(cities, start, end, sink, max_workers=8, rate=2.0, max_per_host=4):
+    """
+    并发抓取 城市×月份 的全部页面，每抓完一页就交给 sink.write(city, year_month, rows) 保存。
+    返回抓取失败的 (城市, 月份) 列表，可以之后单独重试。
+    """
+    tasks = [(city, year_month) for city in cities for year_month in month_range(start, end)]
+    return crawl_pages(tasks, sink, max_workers=max_workers, rate=rate, max_per_host=max_per_host)
+
+
+def crawl_pages(tasks, sink, max_workers=8, rate=2.0, max_per_host=4):
+    """并发抓取给定的 [(城市, 月份)] 页面，用法与 crawl_cities 相同。"""
+    cities = {city for city, _ in tasks}
+    session = create_session(pool_size=max_workers)
+    budget = PolitenessBudget(rate=rate, max_concurrent=max_per_host)
+
+    def fetch(city, year_month):
+        if is_cached(year_month, city):
+            # 已永久缓存的月份不联网，也不占用礼貌限制的额度
+            return get_monthly_weather(year_month, city=city, session=session)
+        host = budget.acquire(BASE_URL.format(city=city, year_month=year_month))
+        try:
+            return get_monthly_weather(year_month, city=city, session=session)
+        finally:
+            budget.release(host)
+
+    print(f"共 {len(cities)} 个城市、{len(tasks)} 个页面，{max_workers} 个线程并发抓取...")
+    started = time.perf_counter()
+    failed, total_rows = [], 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, city, year_month): (city, year_month) for city, year_month in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            city, year_month = futures[future]
+            rows = future.result()
+            if rows is None:
+                failed.append((city, year_month))
+                continue
+            sink.write(city, year_month, rows)
+            total_rows += len(rows)
+            if done % 20 == 0 or done == len(tasks):
+                print(f"进度 {done}/{len(tasks)}，已保存 {total_rows} 行，用时 {time.perf_counter() - started:.1f} 秒")
+
+    if failed:
+        print(f"⚠️ {len(failed)} 个页面抓取失败，例如: {failed[:10]}")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="并发抓取多个城市、多个月份的历史天气")
+    parser.add_argument('--cities', nargs='+', default=['dalian'], help="城市拼音，如 dalian beijing shanghai")
+    parser.add_argument('--start', default='2022-01', help="起始月份 YYYY-MM")
+    parser.add_argument('--end', default='2024-12', help="结束月份 YYYY-MM")
+    parser.add_argument('--workers', type=int, default=8, help="线程数")
+    parser.add_argument('--rate', type=float, default=2.0, help="对同一网站每秒最多请求数")
+    parser.add_argument('--per-host', type=int, default=4, help="对同一网站最多同时进行的请求数")
+    parser.add_argument('--output', default='output/天气_批量.csv')
+    args = parser.parse_args()
+
+    sink = CsvSink(args.output)
+    try:
+        crawl_cities(args.cities, args.start, args.end, sink, max_workers=args.workers,
+                     rate=args.rate, max_per_host=args.per_host)
+    finally:
+        sink.close()
+    print(f"数据已保存到 {args.output}")
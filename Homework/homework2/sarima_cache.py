@@ -0,0 +1,139 @@
+import os
+import json
+import hashlib
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import statsmodels
+from statsmodels.tsa.statespace.sarimax import SARIMAX, SARIMAXResults
+from weather_store import load_weather
+
+CACHE_DIR = 'output/sarima_cache'
+
+# Predictive model.py 原来使用的模型设置
+MODEL_SPEC = {
+    'order': (1, 0, 1),
+    'seasonal_order': (0, 1, 1, 12),
+    'enforce_stationarity': False,
+    'enforce_invertibility': False,
+}
+
+# 批量预测的变量：月平均最高温度、最低温度、风级（白天/夜晚风级范围中点的平均）
+VARIABLES = ['最高温度', '最低温度', '风级']
+
+
+def series_key(series, spec):
+    """序列（日期和数值）与模型设置的哈希，数据或设置任何一处变化都会得到新的键。"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(series.astype('float64')).values.tobytes())
+    digest.update(str(getattr(series.index, 'freq', None)).encode('utf-8'))
+    digest.update(json.dumps(spec, sort_keys=True).encode('utf-8'))
+    # 不同版本的 statsmodels 保存的结果不一定能互相读取
+    digest.update(statsmodels.__version__.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def fit_sarimax(series, spec=MODEL_SPEC, cache_dir=CACHE_DIR):
+    """
+    拟合 SARIMAX 并把拟合结果保存到磁盘；同一序列、同一设置再次调用时直接读取，不再重新拟合。
+    返回 (拟合结果, 是否来自缓存)。
+    """
+    path = os.path.join(cache_dir, series_key(series, spec) + '.pkl')
+    if os.path.exists(path):
+        return SARIMAXResults.load(path), True
+
+    model = SARIMAX(series, **spec)
+    with warnings.catch_warnings():
+        # 三年的月度数据很短，收敛警告对这里的预测没有影响
+        warnings.simplefilter('ignore')
+        results = model.fit(disp=False)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    results.save(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return results, False
+
+
+def monthly_series(df, column):
+    """把每日数据聚合为月平均序列（索引为每月1日，频率 MS）。"""
+    values = df[column].astype('float64')
+    return values.groupby(df['日期'].dt.to_period('M')).mean().to_timestamp().asfreq('MS')
+
+
+def wind_level(df):
+    """每天的风级：白天、夜晚风级范围中点的平均，无法识别的风级（-1）不参与计算。"""
+    levels = []
+    for period in ['白天', '夜晚']:
+        low, high = df[f'{period}最小风级'], df[f'{period}最大风级']
+        levels.append(((low + high) / 2).where((low >= 0) & (high >= 0)))
+    return pd.concat(levels, axis=1).mean(axis=1)
+
+
+def load_series(city, years):
+    """从存储库读取一个城市的数据，返回 {变量: 月平均序列}。"""
+    df = load_weather(city, years=years)
+    df['风级'] = wind_level(df)
+    return {variable: monthly_series(df, variable) for variable in VARIABLES}
+
+
+def _forecast_task(task):
+    """进程池中执行的任务：拟合（或读取缓存）并预测一个 (城市, 变量) 序列。"""
+    key, series, spec, steps, cache_dir = task
+    results, from_cache = fit_sarimax(series, spec, cache_dir)
+    forecast = results.get_forecast(steps=steps)
+    return key, forecast.predicted_mean, forecast.conf_int(), from_cache
+
+
+def batch_forecast(series_by_key, spec=MODEL_SPEC, steps=6, max_workers=None, cache_dir=CACHE_DIR):
+    """
+    对每个 (城市, 变量) 序列分别拟合一个模型并预测 steps 个月，在多个进程中并行执行，
+    总耗时取决于CPU核数而不是序列个数。返回 {键: (预测值, 置信区间)}。
+    """
+    tasks = [(key, series, spec, steps, cache_dir) for key, series in series_by_key.items()]
+    forecasts, cached = {}, 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for key, mean, conf_int, from_cache in executor.map(_forecast_task, tasks):
+            forecasts[key] = (mean, conf_int)
+            cached += from_cache
+    print(f"共 {len(tasks)} 个序列，其中 {cached} 个使用了缓存的模型，{len(tasks) - cached} 个重新拟合。")
+    return forecasts
+
+
+def forecast_table(forecasts):
+    """把 batch_forecast 的结果整理成一张长表：城市、变量、月份、预测值、置信区间上下限。"""
+    frames = []
+    for (city, variable), (mean, conf_int) in forecasts.items():
+        frames.append(pd.DataFrame({
+            '城市': city,
+            '变量': variable,
+            '月份': mean.index.strftime('%Y-%m'),
+            '预测值': mean.values,
+            '下限': conf_int.iloc[:, 0].values,
+            '上限': conf_int.iloc[:, 1].values,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def forecast_cities(cities, years, steps=6, max_workers=None, spec=MODEL_SPEC):
+    """读取各城市的历史数据，批量预测每个城市的最高温度、最低温度和风级。"""
+    series_by_key = {}
+    for city in cities:
+        for variable, series in load_series(city, years).items():
+            series_by_key[(city, variable)] = series.dropna()
+    return forecast_table(batch_forecast(series_by_key, spec, steps, max_workers))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="并行批量预测多个城市的月平均气温和风级（拟合结果缓存在磁盘上）")
+    parser.add_argument('--cities', nargs='+', default=['dalian'])
+    parser.add_argument('--years', type=int, nargs='+', default=[2022, 2023, 2024], help="用于拟合的年份")
+    parser.add_argument('--steps', type=int, default=6, help="预测的月数")
+    parser.add_argument('--workers', type=int, default=None, help="进程数（默认为CPU核数）")
+    parser.add_argument('--output', default='output/sarima_forecast.csv')
+    args = parser.parse_args()
+
+    table = forecast_cities(args.cities, args.years, args.steps, args.workers)
+    table.to_csv(args.output, index=False, encoding='utf_8_sig')
+    print(table.round(1).to_string(index=False))
+    print(f"预测结果已保存到 {args.output}")
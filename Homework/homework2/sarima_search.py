@@ -0,0 +1,212 @@
+import os
+import json
+import argparse
+import itertools
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.seasonal import STL
+from statsmodels.tsa.stattools import kpss
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from sarima_cache import MODEL_SPEC, series_key, load_series
+
+CACHE_DIR = 'output/sarima_search'
+
+# 搜索范围：(p, d, q) × (P, D, Q, 12)。
+# 差分阶数 d、D 不按 AIC 搜索：差分阶数不同，似然就是在不同的序列上计算的，AIC 不能互相比较。
+# d、D 先用检验确定（choose_differencing），再在这个差分阶数下按 AIC 搜索 p、q、P、Q。
+GRID = {'p': [0, 1, 2], 'q': [0, 1, 2], 'P': [0, 1], 'Q': [0, 1]}
+SEASON = 12
+
+# STL 季节强度超过这个值时做一次季节差分（与 forecast 包 nsdiffs 的阈值相同）
+SEASONAL_STRENGTH_THRESHOLD = 0.64
+# KPSS 检验的显著性水平，季节差分后仍拒绝平稳时再做一次普通差分（与 ndiffs 的默认值相同）
+KPSS_ALPHA = 0.05
+
+# 第一轮只迭代很少几次得到近似的 AIC，比当前最好的差 PRUNE_MARGIN 以上的候选直接淘汰，
+# 剩下的最多保留 TOP_K 个做完整拟合
+QUICK_MAXITER = 15
+FULL_MAXITER = 200
+PRUNE_MARGIN = 10.0
+TOP_K = 8
+
+
+def seasonal_strength(values, season=SEASON):
+    """STL 分解后的季节强度 max(0, 1 - Var(残差) / Var(季节 + 残差))，越接近 1 季节性越强。"""
+    result = STL(values, period=season).fit()
+    return max(0.0, 1 - np.var(result.resid) / np.var(result.seasonal + result.resid))
+
+
+def choose_differencing(series, season=SEASON):
+    """
+    拟合之前确定差分阶数 (d, D)：季节强度超过阈值时做一次季节差分，
+    之后 KPSS 检验仍拒绝平稳时再做一次普通差分。
+    """
+    values = np.asarray(series, dtype='float64')
+    D = int(len(values) >= 2 * season and seasonal_strength(values, season) > SEASONAL_STRENGTH_THRESHOLD)
+    if D:
+        values = values[season:] - values[:-season]
+    with warnings.catch_warnings():
+        # 序列很短时 KPSS 统计量常常超出查表范围，p 值取边界值并给出 InterpolationWarning
+        warnings.simplefilter('ignore')
+        p_value = kpss(values, regression='c', nlags='auto')[1]
+    return int(p_value < KPSS_ALPHA), D
+
+
+def candidate_orders(grid=GRID, d=0, D=1):
+    """网格中的全部 (order, seasonal_order) 组合，差分阶数固定为 d、D。"""
+    for p, q, P, Q in itertools.product(grid['p'], grid['q'], grid['P'], grid['Q']):
+        yield (p, d, q), (P, D, Q, SEASON)
+
+
+def _scoring_spec(spec, order, seasonal_order):
+    """
+    打分用的模型设置：先把序列差分好（simple_differencing），再在差分后的序列上按平稳、可逆的 ARMA 计算精确似然，
+    所有候选都在同一段差分后的序列上、用全部观测计算 AIC。
+    不强制平稳时状态用近似扩散初始化，要跳过的观测数等于状态维数，会随 p、q、P、Q 变化，不能用来比较。
+    """
+    return dict(spec, order=order, seasonal_order=seasonal_order, simple_differencing=True,
+                enforce_stationarity=True, enforce_invertibility=True)
+
+
+def _check_sample(series, d, D, candidates):
+    """差分后剩下的观测数：不够估计最大的候选时报错，不足两个季节周期时提示结果不可靠。"""
+    nobs = len(series) - d - D * SEASON
+    most_params = max(order[0] + order[2] + seasonal_order[0] + seasonal_order[2] + 1
+                      for order, seasonal_order in candidates)
+    if nobs <= most_params:
+        raise ValueError(f"序列只有 {len(series)} 个观测，差分后剩下 {nobs} 个，不足以比较最多 {most_params} 个参数的模型，"
+                         "请使用更长的序列或更小的搜索范围")
+    if nobs < 2 * SEASON:
+        print(f"⚠️ 差分后只剩 {nobs} 个观测（不足两个季节周期），季节项的阶数很难可靠地选择")
+    return nobs
+
+
+def _neighbours(candidate, fitted):
+    """已拟合的候选中，与 candidate 只有一个阶数相差 1 的那些。"""
+    flat = candidate[0] + candidate[1][:3]
+    for other in fitted:
+        other_flat = other[0] + other[1][:3]
+        if sum(abs(a - b) for a, b in zip(flat, other_flat)) == 1:
+            yield other
+
+
+def _fit_candidate(task):
+    """
+    进程池中执行：拟合一个候选模型，返回 (候选, AIC, 按参数名保存的参数, 参与似然计算的观测数)。
+    warm_start 为相邻阶数模型的参数，按参数名（如 'ar.L1'、'sigma2'）对应到新模型，
+    对不上的参数用 statsmodels 默认的初始值。拟合失败时 AIC 为 inf。
+    """
+    series, candidate, spec, maxiter, warm_start = task
+    order, seasonal_order = candidate
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            model = SARIMAX(series, **_scoring_spec(spec, order, seasonal_order))
+            start_params = pd.Series(model.start_params, index=model.param_names)
+            if warm_start:
+                shared = start_params.index.intersection(list(warm_start))
+                start_params[shared] = [warm_start[name] for name in shared]
+            results = model.fit(start_params=start_params.values, maxiter=maxiter, disp=False)
+        aic = results.aic if np.isfinite(results.aic) else np.inf
+        return candidate, aic, dict(zip(model.param_names, map(float, results.params))), int(results.nobs_effective)
+    except Exception:
+        return candidate, np.inf, {}, 0
+
+
+def _quick_round(series, spec, candidates, executor):
+    """
+    第一轮：按参数个数 p+q+P+Q 从少到多分批拟合，同一批并行执行；
+    每个候选从前面批次中 AIC 最好的相邻模型的参数开始迭代。
+    """
+    scores, params = {}, {}
+    waves = {}
+    for candidate in candidates:
+        size = candidate[0][0] + candidate[0][2] + candidate[1][0] + candidate[1][2]
+        waves.setdefault(size, []).append(candidate)
+
+    for size in sorted(waves):
+        tasks = []
+        for candidate in waves[size]:
+            neighbours = [other for other in _neighbours(candidate, scores) if np.isfinite(scores[other])]
+            warm_start = params[min(neighbours, key=scores.get)] if neighbours else None
+            tasks.append((series, candidate, spec, QUICK_MAXITER, warm_start))
+        for candidate, aic, fitted, _ in executor.map(_fit_candidate, tasks):
+            scores[candidate], params[candidate] = aic, fitted
+    return scores, params
+
+
+def search_orders(series, spec=MODEL_SPEC, grid=GRID, max_workers=None, cache_dir=CACHE_DIR, use_cache=True,
+                  differencing=None):
+    """
+    自动选择 SARIMA 阶数，返回可直接传给 fit_sarimax 的模型设置和全部候选的排名。
+    差分阶数 (d, D) 由 differencing 给定，为 None 时用 choose_differencing 检验确定；
+    p、q、P、Q 在 grid 中按 AIC 选择，所有候选都在同一段差分后的序列上打分（见 _scoring_spec）。
+    第一轮短迭代得到近似 AIC 并剪枝，第二轮只对剩下的候选从第一轮的参数出发完整拟合。
+    同一序列、同一搜索范围的结果缓存在 cache_dir 中。
+    """
+    d, D = differencing if differencing is not None else choose_differencing(series)
+    candidates = list(candidate_orders(grid, d, D))
+    nobs = _check_sample(series, d, D, candidates)
+
+    settings = {'spec': spec, 'grid': grid, 'season': SEASON, 'differencing': [d, D],
+                'quick_maxiter': QUICK_MAXITER, 'full_maxiter': FULL_MAXITER,
+                'prune_margin': PRUNE_MARGIN, 'top_k': TOP_K}
+    path = os.path.join(cache_dir, series_key(series, settings) + '.json')
+    if use_cache and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return _to_spec(spec, cached['ranking'][0]), pd.DataFrame(cached['ranking'])
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        quick_scores, quick_params = _quick_round(series, spec, candidates, executor)
+
+        best = min(quick_scores.values())
+        survivors = [c for c in sorted(quick_scores, key=quick_scores.get) if quick_scores[c] <= best + PRUNE_MARGIN][:TOP_K]
+        print(f"共 {len(candidates)} 个候选（d={d}, D={D}，差分后 {nobs} 个观测），"
+              f"第一轮剪枝后剩下 {len(survivors)} 个做完整拟合")
+
+        tasks = [(series, candidate, spec, FULL_MAXITER, quick_params[candidate]) for candidate in survivors]
+        full = list(executor.map(_fit_candidate, tasks))
+
+    ranking = sorted(
+        ({'order': list(order), 'seasonal_order': list(seasonal_order), 'aic': float(aic), 'nobs': used}
+         for (order, seasonal_order), aic, _, used in full if np.isfinite(aic)),
+        key=lambda row: row['aic'],
+    )
+    if not ranking:
+        raise RuntimeError("所有候选模型都拟合失败")
+    # 排名中的 AIC 必须来自同样的差分阶数和同一段样本，否则不能互相比较
+    if len({(row['order'][1], row['seasonal_order'][1], row['nobs']) for row in ranking}) != 1:
+        raise RuntimeError(f"候选模型的差分阶数或参与似然计算的观测数不一致: {ranking}")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'ranking': ranking}, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+    return _to_spec(spec, ranking[0]), pd.DataFrame(ranking)
+
+
+def _to_spec(spec, row):
+    return dict(spec, order=tuple(row['order']), seasonal_order=tuple(row['seasonal_order']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="并行搜索每个城市的 SARIMA 阶数（差分阶数由检验确定，按 AIC 选择 p、q、P、Q）")
+    parser.add_argument('--cities', nargs='+', default=['dalian'])
+    parser.add_argument('--variable', default='最高温度', help="最高温度 / 最低温度 / 风级")
+    parser.add_argument('--years', type=int, nargs='+', default=[2022, 2023, 2024])
+    parser.add_argument('--d', type=int, default=None, help="指定非季节差分阶数（默认由 KPSS 检验确定）")
+    parser.add_argument('--D', type=int, default=None, help="指定季节差分阶数（默认由季节强度确定）")
+    parser.add_argument('--workers', type=int, default=None, help="进程数（默认为CPU核数）")
+    parser.add_argument('--no-cache', action='store_true', help="忽略已缓存的搜索结果")
+    args = parser.parse_args()
+
+    for city in args.cities:
+        series = load_series(city, args.years)[args.variable].dropna()
+        d, D = choose_differencing(series)
+        d, D = d if args.d is None else args.d, D if args.D is None else args.D
+        best, ranking = search_orders(series, max_workers=args.workers, use_cache=not args.no_cache, differencing=(d, D))
+        print(f"{city} {args.variable}: order={best['order']}, seasonal_order={best['seasonal_order']}")
+        print(ranking.head(5).round(2).to_string(index=False))
@@ -1,25 +1,31 @@
+import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.font_manager import FontProperties
+from weather_store import load_weather
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 
-# 读取数据
-data = pd.read_csv('output/clean_大连天气_2022-2024.csv')
-
-# 转换日期列为datetime类型
-data['日期'] = pd.to_datetime(data['日期'], format='%Y年%m月%d日')
+# 读取数据（存储库中的数据已清洗，日期已是 datetime 类型）
+data = load_weather('dalian', years=[2022, 2023, 2024])
 
 # 提取年份和月份
 data['年份'] = data['日期'].dt.year
 data['月份'] = data['日期'].dt.month
 
-# 定义天气分类函数
+# 天气类别，同时也是 dominant 模式下的严重程度顺序（越靠前越严重）
+WEATHER_CLASSES = ['雷雨', '雪天', '雨天', '雾天', '阴天', '多云', '晴天', '其他']
+
+# 转折天气（如 '小雨转多云'）取哪一段：first 转之前，last 转之后，dominant 更严重的一段
+COMPOUND_MODE = 'dominant'
+
+
+# 定义天气分类函数（单一天气，保持原来的判断顺序）
 def classify_weather(weather):
     if '晴' in weather:
         return '晴天'
@@ -38,13 +44,41 @@ def classify_weather(weather):
     else:
         return '其他'
 
+
+def classify_compound(weather, mode=COMPOUND_MODE):
+    """按 '转' 拆开转折天气，每一段用 classify_weather 分类，再按 mode 取其中一段的类别。"""
+    classes = [classify_weather(part) for part in str(weather).split('转') if part]
+    if not classes:
+        return '其他'
+    if mode == 'first':
+        return classes[0]
+    if mode == 'last':
+        return classes[-1]
+    if mode == 'dominant':
+        return min(classes, key=WEATHER_CLASSES.index)
+    raise ValueError(f"未知的转折天气模式: {mode}")
+
+
+def classify_column(column, mode=COMPOUND_MODE):
+    """
+    对整列天气分类：只对列中出现过的每种天气字符串分类一次（几十种），
+    再通过 category 编码把结果映射回每一天，耗时与天数、城市数无关。
+    """
+    column = column.astype('category')
+    labels = [WEATHER_CLASSES.index(classify_compound(weather, mode)) for weather in column.cat.categories]
+    # 编码 -1 表示空值，放在最后一个位置归为 '其他'
+    lookup = np.array(labels + [WEATHER_CLASSES.index('其他')], dtype='int8')
+    codes = lookup[column.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=WEATHER_CLASSES), index=column.index)
+
+
 # 分类白天和夜晚天气
-data['白天天气分类'] = data['白天天气'].apply(classify_weather)
-data['夜晚天气分类'] = data['夜晚天气'].apply(classify_weather)
+data['白天天气分类'] = classify_column(data['白天天气'])
+data['夜晚天气分类'] = classify_column(data['夜晚天气'])
 
 # 统计每月各类天气天数
-day_weather_counts = data.groupby(['年份', '月份', '白天天气分类']).size().unstack().fillna(0)
-night_weather_counts = data.groupby(['年份', '月份', '夜晚天气分类']).size().unstack().fillna(0)
+day_weather_counts = data.groupby(['年份', '月份', '白天天气分类'], observed=True).size().unstack().fillna(0)
+night_weather_counts = data.groupby(['年份', '月份', '夜晚天气分类'], observed=True).size().unstack().fillna(0)
 
 # 合并三年的数据，计算月平均
 day_monthly_avg = day_weather_counts.groupby('月份').mean()
@@ -0,0 +1,233 @@
+import os
+import re
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STORE_FORMAT = 'parquet'
+except ImportError:
+    # 没有安装 pyarrow 时退回 pandas 自带的 pickle，同样保留各列的类型
+    STORE_FORMAT = 'pickle'
+
+STORE_DIR = 'output/weather_store'
+
+# 还没有导入存储库的城市，第一次读取时从爬虫保存的CSV自动导入
+LEGACY_CSVS = {
+    'dalian': ['output/大连天气_2022-2024.csv', 'output/大连天气_2025_1-6月.csv'],
+}
+
+DATE_FORMAT = '%Y年%m月%d日'
+
+# 取值只有几十种、却重复出现成千上万次的文字列，存成 category（字典编码）
+CATEGORY_COLUMNS = ['白天天气', '夜晚天气', '白天风力', '夜晚风力']
+
+# 风力解析后的整数列：风向码（16方位，0为北，顺时针每格22.5°，-1为无持续风向），最小/最大风级（-1为无法识别）
+WIND_COLUMNS = [f'{period}{name}' for period in ['白天', '夜晚'] for name in ['风向码', '最小风级', '最大风级']]
+
+COLUMNS = ['日期', '白天天气', '夜晚天气', '最高温度', '最低温度', '白天风力', '夜晚风力'] + WIND_COLUMNS
+
+# 16方位风向，下标即风向码
+WIND_DIRECTIONS = ['北', '北东北', '东北', '东东北', '东', '东东南', '东南', '南东南',
+                   '南', '南西南', '西南', '西西南', '西', '西西北', '西北', '北西北']
+
+_WIND_DIRECTION = re.compile(r'^([东南西北]{1,3})风')
+_WIND_RANGE = re.compile(r'(\d+)\s*[-~～到至]\s*(\d+)\s*级')
+_WIND_BELOW = re.compile(r'[≤<＜]\s*(\d+)\s*级')
+_WIND_SINGLE = re.compile(r'(\d+)\s*级')
+
+
+def clean_weather(raw):
+    """
+    清洗规则（原 clean.py / clean2.py）：去掉有空值的行，即每个月表格中夹带的空行。
+    直接来自爬虫的行里空单元格是空字符串，与从CSV读入的空值同样处理。
+    """
+    return raw.replace('', float('nan')).dropna()
+
+
+def parse_wind_text(text):
+    """
+    解析一个风力字符串，返回 (风向码, 最小风级, 最大风级)，无法识别的部分为 -1。
+    例如 '北风 5-6级' -> (0, 5, 6)，'西北风 1-3级' -> (14, 1, 3)，'无持续风向 ≤3级' -> (-1, 0, 3)，
+    '微风' -> (-1, 0, 2)。
+    """
+    text = str(text).strip()
+    match = _WIND_DIRECTION.match(text)
+    direction = WIND_DIRECTIONS.index(match.group(1)) if match and match.group(1) in WIND_DIRECTIONS else -1
+
+    if match := _WIND_RANGE.search(text):
+        low, high = int(match.group(1)), int(match.group(2))
+    elif match := _WIND_BELOW.search(text):
+        low, high = 0, int(match.group(1))
+    elif match := _WIND_SINGLE.search(text):
+        low = high = int(match.group(1))
+    elif '微风' in text:
+        low, high = 0, 2
+    else:
+        low = high = -1
+    return direction, low, high
+
+
+def parse_wind(column):
+    """
+    把整列风力字符串解析成 风向码/最小风级/最大风级 三个 int8 数组。
+    每种字符串只解析一次（通常只有几十种），再通过 category 编码映射回每一天。
+    """
+    column = column.astype('category')
+    parsed = [parse_wind_text(text) for text in column.cat.categories]
+    # 编码 -1 表示空值，放在最后一个位置，解析结果全为 -1
+    lookup = np.array(parsed + [(-1, -1, -1)], dtype='int8').reshape(-1, 3)
+    values = lookup[column.cat.codes.to_numpy()]
+    return pd.DataFrame(values, columns=['风向码', '最小风级', '最大风级'], index=column.index)
+
+
+def wind_degrees(codes):
+    """风向码转换为角度（北为0°，顺时针），无持续风向为 NaN。"""
+    codes = np.asarray(codes)
+    return np.where(codes >= 0, codes * 22.5, np.nan)
+
+
+def add_wind_columns(df):
+    """根据 白天风力/夜晚风力 计算风向码和风级列。"""
+    for period in ['白天', '夜晚']:
+        parsed = parse_wind(df[f'{period}风力'])
+        for name in parsed.columns:
+            df[f'{period}{name}'] = parsed[name]
+    return df
+
+
+def normalize_weather(raw):
+    """
+    把爬虫得到的原始表格（全是字符串）转换为存储格式：日期转为 datetime64，温度转为 int8，
+    天气和风力转为 category，并把 '北风 5-6级' 解析成风向码和最小/最大风级（int8）。
+    """
+    df = raw[['日期', '白天天气', '夜晚天气', '最高温度', '最低温度', '白天风力', '夜晚风力']].copy()
+    df['最高温度'] = pd.to_numeric(df['最高温度'], errors='coerce')
+    df['最低温度'] = pd.to_numeric(df['最低温度'], errors='coerce')
+    df = clean_weather(df)
+
+    df['日期'] = pd.to_datetime(df['日期'], format=DATE_FORMAT)
+    df['最高温度'] = df['最高温度'].astype('int8')
+    df['最低温度'] = df['最低温度'].astype('int8')
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype(str).str.strip().astype('category')
+    df = add_wind_columns(df)
+    return df[COLUMNS].sort_values('日期', ignore_index=True)
+
+
+def _partition_path(city, year, store_dir=STORE_DIR):
+    return os.path.join(store_dir, city, f'{year}.{STORE_FORMAT}')
+
+
+def _write_partition(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if STORE_FORMAT == 'parquet':
+        df.to_parquet(path + '.tmp', index=False)
+    else:
+        df.to_pickle(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def _read_partition(path, columns=None):
+    if STORE_FORMAT == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_pickle(path)
+    return df if columns is None else df[columns]
+
+
+def save_partitions(df, city, store_dir=STORE_DIR):
+    """按年份把已规范化的数据写入 城市/年份 分区，涉及到的分区整体替换。"""
+    for year, part in df.groupby(df['日期'].dt.year):
+        _write_partition(part.reset_index(drop=True), _partition_path(city, year, store_dir))
+    print(f"已写入 {city} 的 {df['日期'].dt.year.nunique()} 个年份分区，共 {len(df)} 行。")
+
+
+def _as_categories(df):
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype(str).astype('category')
+    return df
+
+
+def upsert_weather(rows, city, store_dir=STORE_DIR):
+    """
+    把新抓取的行（get_monthly_weather 的返回值）清洗、规范化后按 (城市, 日期) 合并进存储库：
+    已有的日期被新行替换，没有的日期追加，只重写涉及到的年份分区。返回写入的行数。
+    """
+    if not rows:
+        return 0
+    new = normalize_weather(pd.DataFrame(rows))
+    for year, part in new.groupby(new['日期'].dt.year):
+        path = _partition_path(city, year, store_dir)
+        if os.path.exists(path):
+            part = pd.concat([_read_partition(path), part], ignore_index=True)
+            part = part.drop_duplicates(subset='日期', keep='last').sort_values('日期', ignore_index=True)
+        _write_partition(_as_categories(part[COLUMNS]), path)
+    return len(new)
+
+
+def available_years(city, store_dir=STORE_DIR):
+    folder = os.path.join(store_dir, city)
+    if not os.path.isdir(folder):
+        return []
+    suffix = '.' + STORE_FORMAT
+    return sorted(int(name[:-len(suffix)]) for name in os.listdir(folder) if name.endswith(suffix))
+
+
+def import_csv(paths, city, store_dir=STORE_DIR):
+    """把爬虫保存的CSV（可以是多个文件）规范化后导入存储库。"""
+    raw = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    df = normalize_weather(raw).drop_duplicates(subset='日期', keep='last')
+    save_partitions(df, city, store_dir)
+    return df
+
+
+def ensure_imported(city, store_dir=STORE_DIR):
+    """存储库中还没有该城市、但有爬虫保存的旧CSV时，先把CSV导入。"""
+    if not available_years(city, store_dir) and city in LEGACY_CSVS:
+        print(f"存储库中还没有 {city} 的数据，正在从CSV导入...")
+        import_csv(LEGACY_CSVS[city], city, store_dir)
+
+
+def load_weather(city='dalian', years=None, columns=None, store_dir=STORE_DIR):
+    """
+    读取一个城市的天气数据，years 为 None 时读取全部年份；只读取需要的年份分区（和列），
+    读出来的日期、温度、天气、风力已经是正确的类型，不需要再解析。
+    """
+    ensure_imported(city, store_dir)
+    stored_years = available_years(city, store_dir)
+    selected = stored_years if years is None else [year for year in years if year in stored_years]
+    if not selected:
+        raise FileNotFoundError(f"存储库中没有 {city} {list(years) if years else ''} 的天气数据")
+
+    paths = [_partition_path(city, year, store_dir) for year in selected]
+    parts = [_read_partition(path, columns) for path in paths]
+    # 各分区的 category 类别不完全相同，合并时统一类别，避免退化成 object
+    categories = [column for column in CATEGORY_COLUMNS if column in parts[0].columns]
+    for column in categories:
+        union = pd.api.types.union_categoricals([part[column] for part in parts])
+        for part in parts:
+            part[column] = pd.Categorical(part[column], categories=union.categories)
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="天气数据存储库：按城市和年份分区保存")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="导入爬虫保存的CSV")
+    import_parser.add_argument('paths', nargs='+')
+    import_parser.add_argument('--city', default='dalian')
+
+    show_parser = subparsers.add_parser('show', help="查看存储库中的数据")
+    show_parser.add_argument('--city', default='dalian')
+    show_parser.add_argument('--years', type=int, nargs='*', default=None)
+
+    args = parser.parse_args()
+    if args.command == 'import':
+        import_csv(args.paths, args.city)
+    else:
+        data = load_weather(args.city, args.years)
+        print(f"{args.city}：{len(data)} 行，年份 {available_years(args.city)}")
+        print(data.dtypes.to_string())
+        print(data.head().to_string())
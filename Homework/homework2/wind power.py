@@ -3,37 +3,27 @@ import matplotlib
 matplotlib.use('TkAgg')
 import matplotlib.pyplot as plt
 import seaborn as sns
+from weather_store import load_weather
+
+# 按最小风级分段：0-2、3、4、5、6及以上，风级为 -1（无法识别）的不落入任何一段
+WIND_LEVEL_BINS = [-0.5, 2, 3, 4, 5, 99]
+WIND_LEVEL_LABELS = ['1-2级', '3-4级', '4-5级', '5-6级', '6级以上']
 
 
 # 1. 数据准备和预处理
 def load_and_preprocess_data():
-    # 读取数据
-    data = pd.read_csv('output/clean_大连天气_2022-2024.csv')
+    # 读取数据（存储库中的数据已清洗，日期已是 datetime 类型）
+    data = load_weather('dalian', years=[2022, 2023, 2024])
 
-    # 转换日期列并提取年月信息
-    data['日期'] = pd.to_datetime(data['日期'], format='%Y年%m月%d日')
+    # 提取年月信息
     data['年份'] = data['日期'].dt.year
     data['月份'] = data['日期'].dt.month
 
-    # 定义风力等级分类函数
-    def classify_wind(wind_str):
-        if pd.isna(wind_str) or wind_str == '无持续风向':
-            return '0级'
-        if '1-2级' in wind_str:
-            return '1-2级'
-        if '3-4级' in wind_str:
-            return '3-4级'
-        if '4-5级' in wind_str:
-            return '4-5级'
-        if '5-6级' in wind_str:
-            return '5-6级'
-        if '6-7级' in wind_str or '7-8级' in wind_str:
-            return '6级以上'
-        return '其他'
-
-    # 对白天和夜晚风力进行分类
-    data['白天风力等级'] = data['白天风力'].apply(classify_wind)
-    data['夜晚风力等级'] = data['夜晚风力'].apply(classify_wind)
+    # 风力等级分类：存储库在导入时已把风力字符串解析成整数风级，这里只按最小风级分段，
+    # 不再对每一天做字符串判断（'1-3级' 归入 '1-2级'，无法识别的归为 '其他'）
+    for period in ['白天', '夜晚']:
+        levels = pd.cut(data[f'{period}最小风级'], bins=WIND_LEVEL_BINS, labels=WIND_LEVEL_LABELS)
+        data[f'{period}风力等级'] = levels.cat.add_categories('其他').fillna('其他')
 
     return data
 
@@ -57,8 +47,9 @@ def create_wind_comparison_plots(data):
 
     # ========== 白天风力 ==========
     # 统计各月份风力分布
-    day_wind = data.groupby(['月份', '白天风力等级']).size().unstack(fill_value=0)
-    day_wind = day_wind[['1-2级', '3-4级', '4-5级', '5-6级', '6级以上']]
+    # 没有出现过的风力等级也保留一列（全为0），下面按 WIND_LEVEL_LABELS 取列
+    day_wind = data.groupby(['月份', '白天风力等级'], observed=False).size().unstack(fill_value=0)
+    day_wind = day_wind[WIND_LEVEL_LABELS]
 
     # 计算三年平均值
     day_avg = day_wind / 3
@@ -101,8 +92,8 @@ def create_wind_comparison_plots(data):
 
     # ========== 夜晚风力 ==========
     # 统计各月份风力分布
-    night_wind = data.groupby(['月份', '夜晚风力等级']).size().unstack(fill_value=0)
-    night_wind = night_wind[['1-2级', '3-4级', '4-5级', '5-6级', '6级以上']]
+    night_wind = data.groupby(['月份', '夜晚风力等级'], observed=False).size().unstack(fill_value=0)
+    night_wind = night_wind[WIND_LEVEL_LABELS]
 
     # 计算三年平均值
     night_avg = night_wind / 3